@@ -0,0 +1,109 @@
+""" benchmark comparing the file size and load time of the storage formats """
+import os
+import pickle
+import random
+import tempfile
+import time
+
+from storage.factory import create_storage
+from storage.storage_ndjson import StorageNdjson, _to_columns, _from_columns
+
+
+POSTER_PREFIX = "https://m.media-amazon.com/images/M/"
+
+
+def generate_movies(count: int) -> dict[str, dict]:
+    """
+    Generate a catalog of fake movies
+
+    :param count: Number of movies
+
+    :return: dict with movie names as keys and movie details as values
+    """
+    rng = random.Random(42)
+    return {
+        f"Movie {i}": {
+            "year": rng.randint(1900, 2024),
+            "rating": round(rng.uniform(0, 10), 1),
+            "poster": f"{POSTER_PREFIX}{rng.getrandbits(64):016x}._V1_SX300.jpg",
+            "fetched": 1700000000.0 + i,
+        }
+        for i in range(count)
+    }
+
+
+def benchmark_file(file_path: str, movies: dict[str, dict], repeat: int) -> tuple[int, float]:
+    """
+    Save the movies to the file and measure how long loading them takes
+
+    :param file_path: Path to the storage file, the format is selected by its extension
+    :param movies: dict with movie names as keys and movie details as values
+    :param repeat: Number of loads, the best time is reported
+
+    :return: tuple with the file size in bytes and the best load time in seconds
+    """
+    storage = create_storage(file_path)
+    storage._save_movies_data(movies)
+    best_time = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        loaded_movies = storage.list_movies()
+        best_time = min(best_time, time.perf_counter() - start_time)
+    assert len(loaded_movies) == len(movies)
+    return os.path.getsize(file_path), best_time
+
+
+def benchmark_ndjson_workers(file_path: str, movies: dict[str, dict], repeat: int) -> None:
+    """
+    Compare the load time of an NDJSON file parsed with different numbers of worker processes
+
+    The pool is started and warmed up before measuring, like the long lived pool of StorageNdjson.
+    The parent share is the work left to the parent process however many workers there are.
+
+    :param file_path: Path to the NDJSON file
+    :param movies: dict with movie names as keys and movie details as values
+    :param repeat: Number of loads per worker count, the best time is reported
+    """
+    StorageNdjson(file_path)._save_movies_data(movies)
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"NDJSON parallel load, {len(movies):,} movies, {os.cpu_count()} CPUs")
+    print(f"{'Workers':<20}{'Load time':>12}")
+    for workers in worker_counts:
+        storage = StorageNdjson(file_path, workers=workers, parallel_min_size=0)
+        try:
+            storage.list_movies()  # starts the pool
+            best_time = float("inf")
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                loaded_movies = storage.list_movies()
+                best_time = min(best_time, time.perf_counter() - start_time)
+        finally:
+            storage.close()
+        assert len(loaded_movies) == len(movies)
+        print(f"{workers:<20}{best_time * 1000:>10.1f}ms")
+
+    columns = pickle.dumps(_to_columns(movies))
+    start_time = time.perf_counter()
+    _from_columns(pickle.loads(columns))
+    parent_time = time.perf_counter() - start_time
+    print(f"{'Parent share':<20}{parent_time * 1000:>10.1f}ms  (unpickling the columns and building the dicts)")
+
+
+def main():
+    movies = generate_movies(50_000)
+    file_names = [
+        "movies.json", "movies.json.gz", "movies.json.bz2", "movies.json.xz",
+        "movies.csv", "movies.csv.gz", "movies.csv.bz2", "movies.csv.xz",
+        "movies.ndjson", "movies.ndjson.gz",
+    ]
+    print(f"{'File':<20}{'Bytes read':>14}{'Load time':>12}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for file_name in file_names:
+            file_size, load_time = benchmark_file(os.path.join(temp_dir, file_name), movies, repeat=3)
+            print(f"{file_name:<20}{file_size:>14,}{load_time * 1000:>10.1f}ms")
+        print()
+        benchmark_ndjson_workers(os.path.join(temp_dir, "workers.ndjson"), generate_movies(200_000), repeat=3)
+
+
+if __name__ == "__main__":
+    main()
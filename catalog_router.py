@@ -0,0 +1,216 @@
+""" router for working with many catalog files, one per team """
+import heapq
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from storage.istorage import IStorage
+from storage.factory import create_storage, STORAGE_CLASSES
+from storage.compression import strip_compression_suffix
+from storage.watcher import StorageWatcher
+
+
+BYTES_PER_LOADED_MOVIE = 768  # measured for a loaded movie dict with title, year, rating, poster and fetched
+
+
+class StorageRouter:
+    """ Class for mapping catalog names to storages, keeping the recently used catalogs loaded """
+    def __init__(
+            self,
+            catalog_dir: str,
+            default_extension: str = ".json",
+            memory_budget: int = 64 * 1024 * 1024,
+            max_workers: int = 8,
+            storage_workers: int = 1,
+    ):
+        """
+        Constructor for the StorageRouter class
+
+        :param catalog_dir: Directory containing one storage file per catalog, in any format create_storage supports
+        :param default_extension: Extension of newly created catalogs, e.g. ".json" or ".csv.gz"
+        :param memory_budget: Maximum estimated memory used by the loaded catalogs
+        :param max_workers: Maximum number of catalogs queried in parallel
+        :param storage_workers: Number of processes parsing a large NDJSON catalog, see create_storage
+        """
+        self.catalog_dir = catalog_dir
+        self.default_extension = default_extension
+        self.memory_budget = memory_budget
+        self.max_workers = max_workers
+        self.storage_workers = storage_workers
+        self.current_bytes = 0
+        # storages are only kept while they are loaded or used elsewhere, e.g. by the app
+        self._storages: weakref.WeakValueDictionary[str, IStorage] = weakref.WeakValueDictionary()
+        self._loaded: OrderedDict[str, tuple[StorageWatcher, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _catalog_files(self) -> dict[str, str]:
+        """
+        Find the catalog files in the catalog directory
+
+        If a catalog exists in several formats, the first file name in sorted order is used.
+
+        :return: dict with catalog names as keys and file names as values
+        """
+        if not os.path.isdir(self.catalog_dir):
+            return {}
+        catalog_files = {}
+        for file_name in sorted(os.listdir(self.catalog_dir)):
+            base_name = strip_compression_suffix(file_name)
+            for extension in STORAGE_CLASSES:
+                if base_name.endswith(extension) and len(base_name) > len(extension):
+                    catalog_files.setdefault(base_name[:-len(extension)], file_name)
+                    break
+        return catalog_files
+
+    def catalog_names(self) -> list[str]:
+        """
+        List all catalogs in the catalog directory
+
+        :return: sorted list of catalog names
+        """
+        return sorted(self._catalog_files())
+
+    @staticmethod
+    def _check_catalog_name(catalog_name: str) -> None:
+        """
+        Make sure a catalog name can only refer to a file directly inside the catalog directory
+
+        :param catalog_name: Name of the catalog
+
+        :raises ValueError: if the name is empty or contains a path separator
+        """
+        separators = {os.sep, os.altsep} - {None}
+        if not catalog_name or catalog_name in {".", ".."} or any(sep in catalog_name for sep in separators):
+            raise ValueError(f"Invalid catalog name: {catalog_name!r}")
+
+    def get_storage(self, catalog_name: str, create: bool = False) -> IStorage:
+        """
+        Get the storage of a catalog
+
+        :param catalog_name: Name of the catalog
+        :param create: If True a missing catalog is created with the default extension on the first save
+
+        :raises ValueError: if the name is invalid, or the catalog does not exist and create is False
+
+        :return: the storage, the same instance for every call with the same name while it is referenced
+        """
+        self._check_catalog_name(catalog_name)
+        with self._lock:
+            storage = self._storages.get(catalog_name)
+            if storage is not None:
+                return storage
+            file_name = self._catalog_files().get(catalog_name)
+            if file_name is None:
+                if not create:
+                    raise ValueError(f"Catalog does not exist: {catalog_name}")
+                file_name = catalog_name + self.default_extension
+            storage = create_storage(os.path.join(self.catalog_dir, file_name), self.storage_workers)
+            if storage is None:
+                raise ValueError(f"Unsupported catalog extension: {file_name}")
+            self._storages[catalog_name] = storage
+            return storage
+
+    def load_catalog(self, catalog_name: str) -> dict[str, dict]:
+        """
+        Get the movies of a catalog, loaded catalogs are only read again if their file changed
+
+        :param catalog_name: Name of the catalog
+
+        :return: dict with movie names as keys and movie details as values, must not be modified
+        """
+        with self._lock:
+            entry = self._loaded.get(catalog_name)
+            if entry is not None:
+                self._loaded.move_to_end(catalog_name)
+        if entry is None:
+            watcher = StorageWatcher(self.get_storage(catalog_name))  # reads the file outside of the lock
+            size = len(watcher.movies) * BYTES_PER_LOADED_MOVIE
+        else:
+            watcher, size = entry
+            if watcher.poll():
+                size = len(watcher.movies) * BYTES_PER_LOADED_MOVIE
+
+        with self._lock:
+            if catalog_name in self._loaded:
+                self.current_bytes -= self._loaded[catalog_name][1]
+            self._loaded[catalog_name] = (watcher, size)
+            self._loaded.move_to_end(catalog_name)
+            self.current_bytes += size
+            while self.current_bytes > self.memory_budget and len(self._loaded) > 1:
+                self._evict_least_recently_used()
+        return watcher.movies
+
+    def _evict_least_recently_used(self) -> None:
+        """
+        Drop the loaded movies of the least recently used catalog, the lock has to be held
+
+        The storages write every change to their file immediately, so nothing is lost.
+        The storage is closed to release its caches and worker processes, it stays usable if it is still referenced.
+        """
+        _, (watcher, size) = self._loaded.popitem(last=False)
+        watcher.storage.close()
+        self.current_bytes -= size
+
+    def loaded_catalog_names(self) -> list[str]:
+        """
+        List the catalogs currently held in memory
+
+        :return: list of catalog names, least recently used first
+        """
+        with self._lock:
+            return list(self._loaded)
+
+    def _map_catalogs(self, function) -> list:
+        """
+        Run a function on the movies of every catalog in parallel
+
+        :param function: function taking a catalog name and its movies
+
+        :return: list of the results, in the order of catalog_names
+        """
+        catalog_names = self.catalog_names()
+        if not catalog_names:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(catalog_names))) as executor:
+            return list(executor.map(
+                lambda catalog_name: function(catalog_name, self.load_catalog(catalog_name)),
+                catalog_names
+            ))
+
+    def global_search(self, search_term: str) -> list[tuple[str, str, dict]]:
+        """
+        Search all catalogs for movies containing the search term in their name
+
+        :param search_term: Partial movie name, case insensitive
+
+        :return: list of tuples with catalog name, movie name and movie details
+        """
+        search_term = search_term.lower()
+        results = self._map_catalogs(lambda catalog_name, movies: [
+            (catalog_name, movie_name, movie_data)
+            for movie_name, movie_data
+            in movies.items()
+            if search_term in movie_name.lower()
+        ])
+        return [found_movie for catalog_results in results for found_movie in catalog_results]
+
+    def global_top_rated(self, count: int = 10) -> list[tuple[str, str, dict]]:
+        """
+        Find the best rated movies of all catalogs
+
+        :param count: Number of movies
+
+        :return: list of tuples with catalog name, movie name and movie details, best rated first
+        """
+        results = self._map_catalogs(lambda catalog_name, movies: heapq.nlargest(
+            count,
+            ((catalog_name, movie_name, movie_data) for movie_name, movie_data in movies.items()),
+            key=lambda found_movie: found_movie[2]["rating"]
+        ))
+        return heapq.nlargest(
+            count,
+            (found_movie for catalog_results in results for found_movie in catalog_results),
+            key=lambda found_movie: found_movie[2]["rating"]
+        )
@@ -0,0 +1,180 @@
+""" derived views of a catalog that are patched with StorageWatcher events instead of being rebuilt """
+import bisect
+from abc import ABC, abstractmethod
+
+from storage.watcher import EVENT_ADDED, EVENT_REMOVED, EVENT_UPDATED
+
+
+class CatalogView(ABC):
+    """ Base class for views that are kept up to date with add/remove/update events """
+    def __init__(self, movies: dict[str, dict] | None = None):
+        """
+        Constructor for the CatalogView class
+
+        :param movies: dict with movie names as keys and movie details as values
+        """
+        for movie_name, movie_data in (movies or {}).items():
+            self.add(movie_name, movie_data)
+
+    @abstractmethod
+    def add(self, title: str, movie_data: dict) -> None:
+        """
+        Add a movie or replace its details
+
+        :param title: Name of the movie
+        :param movie_data: dict with the movie details
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, title: str) -> None:
+        """
+        Remove a movie, if it exists
+
+        :param title: Name of the movie
+        """
+        pass
+
+    def apply_events(self, events: list[dict]) -> None:
+        """
+        Apply the events of a StorageWatcher
+
+        :param events: list of events, each a dict with "type", "title" and "data" keys
+        """
+        for event in events:
+            if event["type"] in (EVENT_ADDED, EVENT_UPDATED):
+                self.add(event["title"], event["data"])
+            elif event["type"] == EVENT_REMOVED:
+                self.remove(event["title"])
+
+
+class MovieStatistics(CatalogView):
+    """ Class for the rating statistics of a catalog """
+    def __init__(self, movies: dict[str, dict] | None = None):
+        """
+        Constructor for the MovieStatistics class
+
+        :param movies: dict with movie names as keys and movie details as values
+        """
+        self._movies: dict[str, dict] = {}
+        self._sorted_ratings: list[float] = []
+        self._movies_by_rating: dict[float, dict[str, dict]] = {}
+        self._rating_sum = 0.0
+        super().__init__(movies)
+
+    def add(self, title: str, movie_data: dict) -> None:
+        """
+        Add a movie or replace its details
+
+        :param title: Name of the movie
+        :param movie_data: dict with the movie details
+        """
+        if title in self._movies:
+            self.remove(title)
+        rating = movie_data["rating"]
+        self._movies[title] = movie_data
+        bisect.insort(self._sorted_ratings, rating)
+        self._movies_by_rating.setdefault(rating, {})[title] = movie_data
+        self._rating_sum += rating
+
+    def remove(self, title: str) -> None:
+        """
+        Remove a movie, if it exists
+
+        :param title: Name of the movie
+        """
+        movie_data = self._movies.pop(title, None)
+        if movie_data is None:
+            return
+        rating = movie_data["rating"]
+        del self._sorted_ratings[bisect.bisect_left(self._sorted_ratings, rating)]
+        del self._movies_by_rating[rating][title]
+        if not self._movies_by_rating[rating]:
+            del self._movies_by_rating[rating]
+        self._rating_sum -= rating
+
+    @property
+    def total_movies(self) -> int:
+        """ The number of movies """
+        return len(self._movies)
+
+    @property
+    def average_rating(self) -> float:
+        """ The mean rating, 0 if there are no movies """
+        return self._rating_sum / len(self._movies) if self._movies else 0
+
+    @property
+    def median_rating(self) -> float:
+        """ The median rating, 0 if there are no movies """
+        count = len(self._sorted_ratings)
+        if count == 0:
+            return 0
+        if count % 2 == 0:
+            return (self._sorted_ratings[count // 2 - 1] + self._sorted_ratings[count // 2]) / 2
+        return self._sorted_ratings[count // 2]
+
+    def best_movies(self) -> list[tuple[str, dict]]:
+        """ The movies with the highest rating """
+        if not self._sorted_ratings:
+            return []
+        return list(self._movies_by_rating[self._sorted_ratings[-1]].items())
+
+    def worst_movies(self) -> list[tuple[str, dict]]:
+        """ The movies with the lowest rating """
+        if not self._sorted_ratings:
+            return []
+        return list(self._movies_by_rating[self._sorted_ratings[0]].items())
+
+
+class MovieGridHtml(CatalogView):
+    """ Class for the movie grid of the generated website, one cached HTML fragment per movie """
+    def __init__(self, movies: dict[str, dict] | None = None):
+        """
+        Constructor for the MovieGridHtml class
+
+        :param movies: dict with movie names as keys and movie details as values
+        """
+        self._fragments: dict[str, str] = {}
+        super().__init__(movies)
+
+    @staticmethod
+    def format_movie(movie_name: str, movie_data: dict) -> str:
+        """
+        Format a movie as an item of the movie grid
+
+        :param movie_name: Name of the movie
+        :param movie_data: dict with the movie details
+
+        :return: HTML list item
+        """
+        return (
+            f'<li>\n'
+            f'<div class="movie">\n'
+            f'<img class="movie-poster" src="{movie_data["poster"]}" alt="{movie_name} Poster">\n'
+            f'<div class="movie-title">{movie_name}</div>\n'
+            f'<div class="movie-year">{movie_data["year"]}</div>\n'
+            f'<div class="movie-rating">IMDb: {movie_data["rating"]}/10</div>\n'
+            f'</div>\n'
+            f'</li>\n'
+        )
+
+    def add(self, title: str, movie_data: dict) -> None:
+        """
+        Format a movie and add or replace its fragment
+
+        :param title: Name of the movie
+        :param movie_data: dict with the movie details
+        """
+        self._fragments[title] = self.format_movie(title, movie_data)
+
+    def remove(self, title: str) -> None:
+        """
+        Remove the fragment of a movie, if it exists
+
+        :param title: Name of the movie
+        """
+        self._fragments.pop(title, None)
+
+    def render(self) -> str:
+        """ The HTML of the whole movie grid """
+        return "".join(self._fragments.values())
@@ -1,36 +1,57 @@
-import sys
+import argparse
+import os
 
 from movie_app import MovieApp
 from storage.storage_json import StorageJson
-from storage.storage_csv import StorageCSV
+from storage.factory import create_storage
+from catalog_router import StorageRouter
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Manage a movie catalog")
+    parser.add_argument("storage_file", nargs="?", help="Storage file or directory of catalog files")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes parsing large NDJSON files, e.g. the number of CPU cores",
+    )
+    args = parser.parse_args()
+
     storage = None
-    if sys.argv[1:]:
-        storage_choice = sys.argv[1]
-        if storage_choice.endswith(".json"):
-            storage = StorageJson(storage_choice)
-        elif storage_choice.endswith(".csv"):
-            storage = StorageCSV(storage_choice)
-        else:
+    router = None
+    if args.storage_file and os.path.isdir(args.storage_file):
+        router = StorageRouter(args.storage_file, storage_workers=args.workers)
+        print(f"Available catalogs: {', '.join(router.catalog_names()) or 'none'}")
+        while not storage:
+            catalog_name = input("Which catalog do you want to open? Enter the name or press enter for default[movies]: ")
+            catalog_name = catalog_name or "movies"
+            create = False
+            if catalog_name not in router.catalog_names():
+                create = input(f"Catalog {catalog_name} does not exist. Create it? (y/N)").lower() == "y"
+                if not create:
+                    continue
+            try:
+                storage = router.get_storage(catalog_name, create=create)
+            except ValueError as e:
+                print(e)
+    elif args.storage_file:
+        storage = create_storage(args.storage_file, args.workers)
+        if not storage:
             print("Invalid file name argument. It will be IGNORED!")
     while not storage:
-        storage_choice = input("Which storage file do you want to use(json/csv)? Enter the file name or press enter for default[movies.json]: ")
+        storage_choice = input("Which storage file do you want to use(json/csv/ndjson, optionally .gz/.bz2/.xz)? Enter the file name or press enter for default[movies.json]: ")
         if storage_choice == "":
             storage = StorageJson("movies.json")
             break
-        if storage_choice.endswith(".json"):
-            storage = StorageJson(storage_choice)
-            break
-        if storage_choice.endswith(".csv"):
-            storage = StorageCSV(storage_choice)
+        storage = create_storage(storage_choice, args.workers)
+        if storage:
             break
         print("Invalid file name. Please try again.")
 
-    app = MovieApp(storage)
+    app = MovieApp(storage, router=router)
     app.run()
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
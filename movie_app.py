@@ -1,11 +1,16 @@
-import math
 import os
-import random
+import threading
 
 from storage.istorage import IStorage
 from user_input import get_valid_arguments
 from storage.storage_json import StorageJson
-from omdbapi import get_movie_data, format_movie_data
+from omdbapi import get_movie_data_with_fetch_time, format_movie_data
+from refresh import refresh_movies, SECONDS_PER_DAY
+from query_cache import QueryCache
+from storage.watcher import StorageWatcher, EVENT_ADDED, EVENT_REMOVED
+from catalog_router import StorageRouter
+from movie_sampler import MovieSampler, reservoir_sample
+from catalog_views import MovieStatistics, MovieGridHtml
 
 
 class MovieApp:
@@ -16,15 +21,24 @@ class MovieApp:
         print(f"\tRelease Date: {movie_data['year']}")
         print(f"\tRating: {movie_data['rating']}")
 
-    @staticmethod
-    def _command_graceful_exit() -> None:
-        """ Gracefully exit the program """
-        print("Exiting the program...")
-        exit(0)
-
-    def __init__(self, storage: IStorage, app_name: str = "Movie App"):
+    def __init__(
+            self,
+            storage: IStorage,
+            app_name: str = "Movie App",
+            cache_max_bytes: int = 64 * 1024 * 1024,
+            router: StorageRouter | None = None,
+    ):
         self.storage = storage
         self.app_name = app_name
+        self.router = router
+        self._refresh_thread = None
+        self._background_refresh_result = None
+        self.query_cache = QueryCache(cache_max_bytes)
+        self.watcher = None
+        self.sampler = None
+        self.statistics = None
+        self.movie_grid = None
+        self._watch_storage()
 
         self.commands = [ # !IMPORTANT! args have to be in the same order as the function arguments
             {
@@ -70,7 +84,7 @@ class MovieApp:
             {
                 "function": self._command_print_random_movie,
                 "description": "Print a random movie",
-                "args": [],
+                "args": ["Sampling Mode"],
             },
             {
                 "function": self._command_fuzzy_search,
@@ -87,12 +101,54 @@ class MovieApp:
                 "description": "Print statistics about the movies",
                 "args": [],
             },
+            {
+                "function": self._command_print_cache_statistics,
+                "description": "Print query cache statistics",
+                "args": [],
+            },
+            {
+                "function": self._command_refresh_movies,
+                "description": "Refresh outdated movie data",
+                "args": ["Max Age Days"],
+            },
+            {
+                "function": self._command_refresh_movies_in_background,
+                "description": "Refresh outdated movie data in the background",
+                "args": ["Max Age Days"],
+            },
         ]
+        if self.router is not None:
+            self.commands += [
+                {
+                    "function": self._command_switch_catalog,
+                    "description": "Switch to another catalog",
+                    "args": ["Catalog Name"],
+                },
+                {
+                    "function": self._command_global_search,
+                    "description": "Search for a movie in all catalogs",
+                    "args": ["Search Term"],
+                },
+                {
+                    "function": self._command_global_top_rated,
+                    "description": "Print the best rated movies of all catalogs",
+                    "args": [],
+                },
+            ]
+
+    def _command_graceful_exit(self) -> None:
+        """ Gracefully exit the program, after a running background refresh saved its changes """
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            print("Waiting for the background refresh to finish...")
+            self._refresh_thread.join()  # killing the daemon thread mid-save would leave a truncated file
+        print("Exiting the program...")
+        exit(0)
 
     def run(self) -> None:
         """ Run the movie app """
         print("Welcome to the movie app!")
         while True:
+            self._print_background_refresh_result()
             self._list_commands()
             try:
                 command_index = int(input("Enter a command number: "))
@@ -119,7 +175,7 @@ class MovieApp:
     def _command_add_movie(self, movie_name: str) -> None:
         """ Add a new movie """
         try:
-            api_movie_data = get_movie_data(movie_name)
+            api_movie_data, fetched = get_movie_data_with_fetch_time(movie_name)  # may come from the cache
         except Exception as e:
             print(f"Could not get the movie data: {e}")
             return
@@ -128,102 +184,203 @@ class MovieApp:
             print("Could not get the movie data for:", movie_name)
             print("Please check the movie name and try again")
             return
-        self.storage.add_movie(movie_data["title"], movie_data["year"], movie_data["rating"], movie_data["poster"])
+        with self.storage.lock:
+            if self.watcher is not None:
+                self.watcher.poll()  # the save keeps changes of other processes, the watcher has to see them first
+            added = self.storage.add_movie(
+                movie_data["title"],
+                movie_data["year"],
+                movie_data["rating"],
+                movie_data["poster"],
+                fetched
+            )
+            if added and self.watcher is not None:  # patches the sampler and views without rereading the file
+                self.watcher.record_changes([{
+                    "type": EVENT_ADDED,
+                    "title": movie_data["title"],
+                    "data": {
+                        "year": movie_data["year"],
+                        "rating": movie_data["rating"],
+                        "poster": movie_data["poster"],
+                        "fetched": fetched
+                    },
+                }])
 
     def _command_remove_movie(self, movie_name: str) -> None:
         """ Remove a movie """
-        self.storage.delete_movie(movie_name)
+        with self.storage.lock:
+            if self.watcher is not None:
+                self.watcher.poll()  # the save keeps changes of other processes, the watcher has to see them first
+            removed = self.storage.delete_movie(movie_name)
+            if removed and self.watcher is not None and movie_name in self.watcher.movies:
+                self.watcher.record_changes([{
+                    "type": EVENT_REMOVED,
+                    "title": movie_name,
+                    "data": self.watcher.movies[movie_name],
+                }])
 
     def _command_edit_movie(self, movie_name: str, new_rating: float) -> None:
         """ Edit a movies rating """
         self.storage.update_movie(movie_name, new_rating)
 
+    def _watch_storage(self) -> None:
+        """
+        Start watching the current storage, if it is file based
+
+        The sampler, the statistics and the website grid are built once and then patched with the events
+        of the watcher.
+        """
+        if not hasattr(self.storage, "file_path"):
+            self.watcher = None
+            self.sampler = None
+            self.statistics = None
+            self.movie_grid = None
+            return
+        self.watcher = StorageWatcher(self.storage)
+        self.sampler = MovieSampler(self.watcher.movies)
+        self.statistics = MovieStatistics(self.watcher.movies)
+        self.movie_grid = MovieGridHtml(self.watcher.movies)
+        self.watcher.add_listener(self.sampler.apply_events)
+        self.watcher.add_listener(self.statistics.apply_events)
+        self.watcher.add_listener(self.movie_grid.apply_events)
+
+    def _cached_query(self, query_name: str, compute, *args):
+        """
+        Run a query, results are reused as long as the movies data did not change
+
+        :param query_name: Name of the query, part of the cache key
+        :param compute: function computing the result from the args
+        :param args: Arguments of the query, part of the cache key
+
+        :return: the result of the query, must not be modified
+        """
+        if self.watcher is not None:
+            self.watcher.poll()  # notices changes by other processes, the file is only read if its stat changed
+        key = (query_name, args, self.storage.version)
+        return self.query_cache.get_or_compute(key, lambda: compute(*args))
+
+    def _get_movies(self) -> dict[str, dict]:
+        """ The movies of the catalog, from the watcher if there is one so the file is not read again """
+        if self.watcher is not None:
+            return self.watcher.movies
+        return self.storage.list_movies()
+
+    def _query_list_movies(self) -> list[tuple[str, dict]]:
+        """ Get all movies """
+        return list(self._get_movies().items())
+
+    def _query_sorted_movies(self, field: str, ascending: bool) -> list[tuple[str, dict]]:
+        """ Get all movies sorted by the given field """
+        movies = self._get_movies()
+        return sorted(
+            movies.items(),
+            key=lambda item_tuple: item_tuple[1][field],
+            reverse=not ascending
+        )
+
+    def _query_fuzzy_search(self, search_term: str) -> list[tuple[str, dict]]:
+        """ Get all movies containing the search term in their name """
+        movies = self._get_movies()
+        return [
+            (movie_name, movie_data)
+            for movie_name, movie_data
+            in movies.items()
+            if search_term.lower() in movie_name.lower()
+        ]
+
+    def _query_filter_movies(self, minimum_rating: float, start_year: int, end_year: int) -> list[tuple[str, dict]]:
+        """ Get all movies matching the rating and release date filters """
+        movies = self._get_movies()
+        return [
+            (movie_name, movie_data)
+            for movie_name, movie_data
+            in movies.items()
+            if minimum_rating <= movie_data['rating'] and start_year <= movie_data['year'] <= end_year
+        ]
+
+    def _query_statistics(self) -> dict:
+        """ Get statistics about the movies """
+        if self.statistics is not None:
+            statistics = self.statistics  # patched by the watcher events
+        else:
+            statistics = MovieStatistics(self.storage.list_movies())
+        return {
+            "total_movies": statistics.total_movies,
+            "average_rating": statistics.average_rating,
+            "median_rating": statistics.median_rating,
+            "best_movies": statistics.best_movies(),
+            "worst_movies": statistics.worst_movies(),
+        }
+
     def _command_list_movies(self) -> None:
         """ List all movies """
-        movies = self.storage.list_movies()
-        for movie_name, movie in movies.items():
+        movies = self._cached_query("list_movies", self._query_list_movies)
+        for movie_name, movie in movies:
             MovieApp._print_movie(movie_name, movie)
 
     def _command_list_movies_sorted_by_rating(self, ascending: bool) -> None:
         """ List all movies sorted by rating """
-        movies = self.storage.list_movies()
-        sorted_movies = sorted(
-            movies.items(),
-            key=lambda item_tuple: item_tuple[1]['rating'],
-            reverse=not ascending
-        )
-
+        sorted_movies = self._cached_query("sorted_movies", self._query_sorted_movies, "rating", ascending)
         for movie_name, movie_data in sorted_movies:
             MovieApp._print_movie(movie_name, movie_data)
 
     def _command_list_movies_sorted_by_release_date(self, ascending: bool) -> None:
         """ List all movies sorted by release date """
-        movies = self.storage.list_movies()
-        sorted_movies = sorted(
-            movies.items(),
-            key=lambda item_tuple: item_tuple[1]['year'],
-            reverse=not ascending
-        )
-
+        sorted_movies = self._cached_query("sorted_movies", self._query_sorted_movies, "year", ascending)
         for movie_name, movie_data in sorted_movies:
             MovieApp._print_movie(movie_name, movie_data)
 
-    def _command_print_random_movie(self) -> None:
+    def _command_print_random_movie(self, sampling_mode: str) -> None:
         """ Print a random movie """
-        movies = self.storage.list_movies()
-        random_movie_name = random.choice(list(movies.keys()))
-        MovieApp._print_movie(random_movie_name, movies[random_movie_name])
+        if sampling_mode == "stream" or self.sampler is None:
+            random_movie = reservoir_sample(self.storage.iter_movies())
+        else:
+            self.watcher.poll()  # keeps the sampler up to date, the file is only read if its stat changed
+            if sampling_mode == "weighted":
+                random_movie = self.sampler.weighted_by_rating()
+            elif sampling_mode == "decade":
+                random_movie = self.sampler.by_decade()
+            else:
+                random_movie = self.sampler.uniform()
+        if random_movie is None:
+            print("There are no movies to pick from")
+            return
+        MovieApp._print_movie(*random_movie)
 
     def _command_fuzzy_search(self, search_term: str) -> None:
         """ Fuzzy search for a movie """
-        movies = self.storage.list_movies()
-        found_movies = {}
-        for movie_name in movies:
-            if search_term.lower() in movie_name.lower():
-                found_movies[movie_name] = movies[movie_name]
+        found_movies = self._cached_query("fuzzy_search", self._query_fuzzy_search, search_term)
         if not found_movies:
             print(f'No movies found with the partial name "{search_term}"')
             return
         print(f'Movies found with the partial name "{search_term}":')
-        for found_movie_name, found_movie_data in found_movies.items():
+        for found_movie_name, found_movie_data in found_movies:
             MovieApp._print_movie(found_movie_name, found_movie_data)
 
     def _command_filter_movies(self, minimum_rating: float, start_year: int, end_year: int) -> None:
         """ Filter movies by rating and release date """
-        movies = self.storage.list_movies()
-        found_movies = {}
-        for movie_name, movie_data in movies.items():
-            if minimum_rating <= movie_data['rating'] and start_year <= movie_data['year'] <= end_year:
-                found_movies[movie_name] = movie_data
+        found_movies = self._cached_query(
+            "filter_movies",
+            self._query_filter_movies,
+            minimum_rating,
+            start_year,
+            end_year
+        )
         if not found_movies:
             print("No movies found with the given filters")
             return
         print("Movies found with the given filters:")
-        for found_movie_name, found_movie_data in found_movies.items():
+        for found_movie_name, found_movie_data in found_movies:
             MovieApp._print_movie(found_movie_name, found_movie_data)
 
     def _command_print_statistics(self) -> None:
         """ Print statistics about the movies """
-        movies = self.storage.list_movies()
-        total_movies = len(movies)
-        ratings = [movie_data['rating'] for movie_data in movies.values()]
-        average_rating = sum(ratings) / total_movies if total_movies > 0 else 0
-        if len(ratings) % 2 == 0:
-            half_len = len(ratings) / 2
-            median_rating = (ratings[math.floor(half_len)] + ratings[math.ceil(half_len)]) / 2
-        else:
-            median_rating = ratings[len(ratings) // 2]
-        print(f"Total movies: {total_movies}")
-        print(f"Average rating: {average_rating:.1f}")
-        print(f"Median rating: {median_rating:.1f}")
+        statistics = self._cached_query("statistics", self._query_statistics)
+        print(f"Total movies: {statistics['total_movies']}")
+        print(f"Average rating: {statistics['average_rating']:.1f}")
+        print(f"Median rating: {statistics['median_rating']:.1f}")
 
-        best_movie_rating = max(ratings, default=0)
-        best_movies = [
-            (movie_name, movie_data)
-            for movie_name, movie_data
-            in movies.items()
-            if movie_data['rating'] == best_movie_rating
-        ]
+        best_movies = statistics["best_movies"]
         if best_movies:
             if len(best_movies) == 1:
                 print("Best movie:")
@@ -232,13 +389,7 @@ class MovieApp:
             for best_movie_name, best_movie_data in best_movies:
                 MovieApp._print_movie(best_movie_name, best_movie_data)
 
-        worst_movie_rating = min(ratings, default=0)
-        worst_movies = [
-            (movie_name, movie_data)
-            for movie_name, movie_data
-            in movies.items()
-            if movie_data['rating'] == worst_movie_rating
-        ]
+        worst_movies = statistics["worst_movies"]
         if worst_movies:
             if len(worst_movies) == 1:
                 print("Worst movie:")
@@ -247,25 +398,104 @@ class MovieApp:
             for worst_movie_name, worst_movie_data in worst_movies:
                 MovieApp._print_movie(worst_movie_name, worst_movie_data)
 
+    def _command_print_cache_statistics(self) -> None:
+        """ Print statistics about the query cache """
+        print(f"Cached queries: {len(self.query_cache)}")
+        print(f"Cache size: {self.query_cache.current_bytes / 1024:.1f} KiB of {self.query_cache.max_bytes / 1024:.1f} KiB")
+        print(f"Hits: {self.query_cache.hits}")
+        print(f"Misses: {self.query_cache.misses}")
+        print(f"Evictions: {self.query_cache.evictions}")
+        print(f"Hit rate: {self.query_cache.hit_rate:.1%}")
+
+    def _command_refresh_movies(self, max_age_days: float) -> None:
+        """ Refresh the data of all movies fetched longer ago than the given number of days """
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            print("A refresh is already running in the background")
+            return
+        changed_titles, failed_titles = refresh_movies(self.storage, max_age_days * SECONDS_PER_DAY)
+        MovieApp._print_refresh_result(changed_titles, failed_titles)
+
+    @staticmethod
+    def _print_refresh_result(changed_titles: list[str], failed_titles: dict[str, str]) -> None:
+        """ Print the movies a refresh changed or could not fetch """
+        for movie_name, error in failed_titles.items():
+            print(f"Could not refresh {movie_name}: {error}")
+        if not changed_titles:
+            print("No movie data changed")
+            return
+        print("Updated movies:")
+        for movie_name in changed_titles:
+            print(f"\t{movie_name}")
+
+    def _refresh_movies_in_background(self, max_age_days: float) -> None:
+        """ Refresh outdated movie data, the result is printed by the main thread before the next command """
+        self._background_refresh_result = refresh_movies(self.storage, max_age_days * SECONDS_PER_DAY)
+
+    def _print_background_refresh_result(self) -> None:
+        """ Print the result of a finished background refresh, if there is one """
+        if self._background_refresh_result is None:
+            return
+        print("Background refresh finished")
+        MovieApp._print_refresh_result(*self._background_refresh_result)
+        self._background_refresh_result = None
+
+    def _command_refresh_movies_in_background(self, max_age_days: float) -> None:
+        """ Refresh outdated movie data without blocking the app """
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            print("A refresh is already running in the background")
+            return
+        self._refresh_thread = threading.Thread(
+            target=self._refresh_movies_in_background,
+            args=(max_age_days,),
+            daemon=True
+        )
+        self._refresh_thread.start()
+        print("Refresh started in the background")
+
+    def _command_switch_catalog(self, catalog_name: str) -> None:
+        """ Switch to another catalog of the router """
+        try:
+            self.storage = self.router.get_storage(catalog_name)
+        except ValueError as e:
+            print(e)
+            print(f"Available catalogs: {', '.join(self.router.catalog_names()) or 'none'}")
+            return
+        self._watch_storage()
+        self.query_cache.clear()  # the versions of different storages are not comparable
+        print(f"Switched to catalog: {catalog_name}")
+
+    def _command_global_search(self, search_term: str) -> None:
+        """ Search for a movie in all catalogs """
+        found_movies = self.router.global_search(search_term)
+        if not found_movies:
+            print(f'No movies found with the partial name "{search_term}" in any catalog')
+            return
+        print(f'Movies found with the partial name "{search_term}":')
+        for catalog_name, found_movie_name, found_movie_data in found_movies:
+            print(f"Catalog: {catalog_name}")
+            MovieApp._print_movie(found_movie_name, found_movie_data)
+
+    def _command_global_top_rated(self) -> None:
+        """ Print the best rated movies of all catalogs """
+        top_movies = self.router.global_top_rated()
+        if not top_movies:
+            print("No movies found in any catalog")
+            return
+        for catalog_name, movie_name, movie_data in top_movies:
+            print(f"Catalog: {catalog_name}")
+            MovieApp._print_movie(movie_name, movie_data)
+
     def _command_generate_website(self):
         """ Generate a website with all movies """
         if not os.path.exists("./_static/index_template.html"):
             print("The movie grid template file does not exist")
             return
 
-        movies = self.storage.list_movies()
-        movie_grid_content = ""
-        for movie_name, movie_data in movies.items():
-            movie_grid_content += (
-                f'<li>\n'
-                f'<div class="movie">\n'
-                f'<img class="movie-poster" src="{movie_data["poster"]}" alt="{movie_name} Poster">\n'
-                f'<div class="movie-title">{movie_name}</div>\n'
-                f'<div class="movie-year">{movie_data["year"]}</div>\n'
-                f'<div class="movie-rating">IMDb: {movie_data["rating"]}/10</div>\n'
-                f'</div>\n'
-                f'</li>\n'
-            )
+        if self.movie_grid is not None:
+            self.watcher.poll()  # patches the grid, only the changed movies are formatted again
+            movie_grid_content = self.movie_grid.render()
+        else:
+            movie_grid_content = MovieGridHtml(self.storage.list_movies()).render()
 
         with open("./_static/index_template.html", "r") as fileobj:
             movie_grid_template = fileobj.read()
@@ -0,0 +1,186 @@
+""" random selection of movies from a catalog """
+import random
+from typing import Iterable
+
+from catalog_views import CatalogView
+
+
+SAMPLING_MODES = ["uniform", "weighted", "decade", "stream"]
+
+
+def reservoir_sample(items: Iterable, rng: random.Random | None = None):
+    """
+    Pick one item uniformly from an iterable without keeping all items in memory
+
+    :param items: iterable of any length
+    :param rng: random number generator, defaults to the random module
+
+    :return: the picked item, None if the iterable was empty
+    """
+    rng = rng or random
+    picked_item = None
+    for count, item in enumerate(items, start=1):
+        if rng.randrange(count) == 0:  # replaces the pick with probability 1/count
+            picked_item = item
+    return picked_item
+
+
+def build_alias_table(weights: list[float]) -> tuple[list[float], list[int]]:
+    """
+    Build the tables of Vose's alias method for picking indexes in proportion to their weight
+
+    :param weights: non-negative weights with a positive sum
+
+    :return: tuple with the probability table and the alias table
+    """
+    count = len(weights)
+    total_weight = sum(weights)
+    scaled_weights = [weight * count / total_weight for weight in weights]
+    probabilities = [1.0] * count
+    aliases = list(range(count))
+    small = [i for i, weight in enumerate(scaled_weights) if weight < 1.0]
+    large = [i for i, weight in enumerate(scaled_weights) if weight >= 1.0]
+    while small and large:
+        small_index = small.pop()
+        large_index = large.pop()
+        probabilities[small_index] = scaled_weights[small_index]
+        aliases[small_index] = large_index
+        scaled_weights[large_index] -= 1.0 - scaled_weights[small_index]
+        if scaled_weights[large_index] < 1.0:
+            small.append(large_index)
+        else:
+            large.append(large_index)
+    return probabilities, aliases  # leftovers keep probability 1.0, only off by rounding errors
+
+
+class IndexedTitles:
+    """ Class for a set of titles supporting O(1) add, remove and uniform random pick """
+    def __init__(self):
+        self._titles: list[str] = []
+        self._positions: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def __contains__(self, title: str) -> bool:
+        return title in self._positions
+
+    def add(self, title: str) -> None:
+        """ Add a title, if it is not already contained """
+        if title in self._positions:
+            return
+        self._positions[title] = len(self._titles)
+        self._titles.append(title)
+
+    def remove(self, title: str) -> None:
+        """ Remove a title by moving the last title into its slot """
+        position = self._positions.pop(title, None)
+        if position is None:
+            return
+        last_title = self._titles.pop()
+        if position < len(self._titles):
+            self._titles[position] = last_title
+            self._positions[last_title] = position
+
+    def pick(self, rng: random.Random) -> str:
+        """ Pick a title uniformly, the set must not be empty """
+        return self._titles[rng.randrange(len(self._titles))]
+
+    def titles(self) -> list[str]:
+        """ The contained titles, in no particular order """
+        return self._titles
+
+
+class MovieSampler(CatalogView):
+    """ Class for picking random movies, kept up to date with add/remove/update events """
+    def __init__(self, movies: dict[str, dict] | None = None, rng: random.Random | None = None):
+        """
+        Constructor for the MovieSampler class
+
+        :param movies: dict with movie names as keys and movie details as values
+        :param rng: random number generator, defaults to a new random.Random
+        """
+        self.rng = rng or random.Random()
+        self._movies: dict[str, dict] = {}
+        self._titles = IndexedTitles()
+        self._decades: dict[int, IndexedTitles] = {}
+        self._alias_table = None  # built on the first weighted pick after a change
+        super().__init__(movies)
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def add(self, title: str, movie_data: dict) -> None:
+        """
+        Add a movie or replace its details
+
+        :param title: Name of the movie
+        :param movie_data: dict with the movie details
+        """
+        if title in self._movies:
+            self.remove(title)
+        self._movies[title] = movie_data
+        self._titles.add(title)
+        decade = movie_data["year"] // 10 * 10
+        self._decades.setdefault(decade, IndexedTitles()).add(title)
+        self._alias_table = None
+
+    def remove(self, title: str) -> None:
+        """
+        Remove a movie, if it exists
+
+        :param title: Name of the movie
+        """
+        movie_data = self._movies.pop(title, None)
+        if movie_data is None:
+            return
+        self._titles.remove(title)
+        decade = movie_data["year"] // 10 * 10
+        self._decades[decade].remove(title)
+        if not self._decades[decade]:
+            del self._decades[decade]
+        self._alias_table = None
+
+    def _pick_result(self, title: str) -> tuple[str, dict]:
+        return title, self._movies[title]
+
+    def uniform(self) -> tuple[str, dict] | None:
+        """
+        Pick a movie, every movie has the same chance
+
+        :return: tuple with the movie name and details, None if there are no movies
+        """
+        if not self._titles:
+            return None
+        return self._pick_result(self._titles.pick(self.rng))
+
+    def weighted_by_rating(self) -> tuple[str, dict] | None:
+        """
+        Pick a movie with a chance proportional to its rating
+
+        :return: tuple with the movie name and details, None if there are no movies
+        """
+        if not self._titles:
+            return None
+        if self._alias_table is None:
+            titles = list(self._titles.titles())
+            weights = [self._movies[title]["rating"] for title in titles]
+            if sum(weights) <= 0:  # nothing to weigh by
+                return self.uniform()
+            self._alias_table = (titles, *build_alias_table(weights))
+        titles, probabilities, aliases = self._alias_table
+        index = self.rng.randrange(len(titles))
+        if self.rng.random() >= probabilities[index]:
+            index = aliases[index]
+        return self._pick_result(titles[index])
+
+    def by_decade(self) -> tuple[str, dict] | None:
+        """
+        Pick a decade with movies, then a movie of that decade, every decade has the same chance
+
+        :return: tuple with the movie name and details, None if there are no movies
+        """
+        if not self._decades:
+            return None
+        decade = self.rng.choice(list(self._decades))
+        return self._pick_result(self._decades[decade].pick(self.rng))
@@ -1,25 +1,68 @@
 import os
+import threading
+import time
+from collections import OrderedDict
+
 import requests
 import dotenv
 
 
 dotenv.load_dotenv()
 OMDB_API_KEY = os.getenv("OMDB_API_KEY")
+MOVIE_DATA_CACHE_SIZE = 1024  # number of lookups kept, the least recently used one is dropped first
+MOVIE_DATA_CACHE_MAX_AGE = 24 * 60 * 60  # seconds after which a cached lookup is fetched again
+
+# shared by every storage and catalog of the process, keeps the connection open between requests
+_session = requests.Session()
+_movie_data_cache: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+_movie_data_cache_lock = threading.Lock()
 
 
-def get_movie_data(title: str) -> dict:
+def get_movie_data_with_fetch_time(title: str, use_cache: bool = True) -> tuple[dict, float]:
     """
-    Get the movie data from the OMDB API
+    Get the movie data from the OMDB API, together with the time it was fetched
+
+    Successful lookups are cached for MOVIE_DATA_CACHE_MAX_AGE seconds, at most MOVIE_DATA_CACHE_SIZE of them.
 
     :param title: Title of the movie
+    :param use_cache: If False the API is always asked, the result still replaces the cached one
 
-    :return: dict with movie data
+    :return: tuple with a dict with movie data and the timestamp of when it was fetched from the API
     """
+    cache_key = title.lower()
+    if use_cache:
+        with _movie_data_cache_lock:
+            entry = _movie_data_cache.get(cache_key)
+            if entry is not None:
+                if time.time() - entry[1] <= MOVIE_DATA_CACHE_MAX_AGE:
+                    _movie_data_cache.move_to_end(cache_key)
+                    return entry
+                del _movie_data_cache[cache_key]
     url = f"http://www.omdbapi.com/?apikey={OMDB_API_KEY}&t={title}"
-    response = requests.get(url, timeout=5)
+    response = _session.get(url, timeout=5)
     if response.status_code != 200:
         raise Exception("Could not get the movie data")
-    return response.json()
+    movie_data = response.json()
+    fetched = time.time()
+    if movie_data.get("Response") == "True":  # failed lookups are not cached, the movie may be added later
+        with _movie_data_cache_lock:
+            _movie_data_cache[cache_key] = (movie_data, fetched)
+            _movie_data_cache.move_to_end(cache_key)
+            while len(_movie_data_cache) > MOVIE_DATA_CACHE_SIZE:
+                _movie_data_cache.popitem(last=False)
+    return movie_data, fetched
+
+
+def get_movie_data(title: str, use_cache: bool = True) -> dict:
+    """
+    Get the movie data from the OMDB API
+
+    :param title: Title of the movie
+    :param use_cache: If False the API is always asked, the result still replaces the cached one
+
+    :return: dict with movie data
+    """
+    return get_movie_data_with_fetch_time(title, use_cache)[0]
 
 
 def format_movie_data(movie_data: dict) -> tuple[bool, dict]:
@@ -0,0 +1,82 @@
+""" memory bounded LRU cache for the results of MovieApp queries """
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+BYTES_PER_RESULT_ROW = 128
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory used by a query result without walking it
+
+    Results are lists of (movie name, movie details) tuples, the details dicts belong to the loaded catalog
+    and are shared, so every row only costs its tuple and list slot.
+
+    :param value: value to measure
+
+    :return: size in bytes
+    """
+    if isinstance(value, (list, tuple, dict)):
+        return sys.getsizeof(value) + len(value) * BYTES_PER_RESULT_ROW
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """ Class for memoizing query results, the least recently used results are evicted first """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Constructor for the QueryCache class
+
+        :param max_bytes: Maximum estimated memory used by the cached results
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """ Share of lookups answered from the cache, 0.0 if there were none """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get a cached result, or compute and cache it
+
+        The returned result is shared between callers and must not be modified.
+
+        :param key: Key of the query, has to change whenever the result could change
+        :param compute: function computing the result on a miss
+
+        :return: the result of the query
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+        self.misses += 1
+        result = compute()
+        size = estimate_size(result)
+        if size > self.max_bytes:  # would evict everything else and still not fit
+            return result
+        self._entries[key] = (result, size)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+        return result
+
+    def clear(self) -> None:
+        """ Remove all cached results, the statistics are kept """
+        self._entries.clear()
+        self.current_bytes = 0
@@ -0,0 +1,138 @@
+""" helper functions for refreshing outdated movie data from the OMDB API """
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from storage.istorage import IStorage
+from omdbapi import get_movie_data, format_movie_data
+
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def fetch_fresh_movie_data(title: str) -> dict:
+    """
+    Get the movie data from the OMDB API, bypassing the cache
+
+    :param title: Title of the movie
+
+    :return: dict with movie data
+    """
+    return get_movie_data(title, use_cache=False)
+
+
+class RateLimiter:
+    """ Class for spacing out requests so that at most a given number per second are made """
+    def __init__(self, requests_per_second: float):
+        """
+        Constructor for the RateLimiter class
+
+        :param requests_per_second: Maximum number of requests per second
+        """
+        self.min_interval = 1 / requests_per_second
+        self._lock = threading.Lock()
+        self._next_request_time = 0.0
+
+    def wait(self) -> None:
+        """ Block until the next request is allowed """
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + self.min_interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def find_stale_movies(movies: dict[str, dict], max_age: float, now: float | None = None) -> list[str]:
+    """
+    Find the movies whose data was fetched longer ago than the given age
+
+    :param movies: dict with movie names as keys and movie details as values
+    :param max_age: Maximum age in seconds
+    :param now: Current timestamp, defaults to time.time()
+
+    :return: list of movie names, movies without a fetched timestamp are always stale
+    """
+    if now is None:
+        now = time.time()
+    return [
+        movie_name
+        for movie_name, movie_data
+        in movies.items()
+        if now - movie_data.get("fetched", 0) > max_age
+    ]
+
+
+def fetch_updates(
+        movies: dict[str, dict],
+        titles: list[str],
+        fetch: Callable[[str], dict] = fetch_fresh_movie_data,
+        max_workers: int = 4,
+        requests_per_second: float = 5.0,
+) -> tuple[dict[str, dict], list[str], dict[str, str]]:
+    """
+    Fetch the current data of the given movies in parallel
+
+    :param movies: dict with movie names as keys and movie details as values
+    :param titles: Names of the movies to fetch
+    :param fetch: function returning the raw API data for a title
+    :param max_workers: Maximum number of concurrent requests
+    :param requests_per_second: Maximum number of requests per second
+
+    :return: tuple with a dict of the details to update per movie name, a list of the movie names
+        whose rating or poster changed, and a dict with the error message per movie name that could not be fetched
+    """
+    rate_limiter = RateLimiter(requests_per_second)
+
+    def fetch_one(title: str) -> tuple[str, bool, dict, str]:
+        rate_limiter.wait()
+        try:
+            success, movie_data = format_movie_data(fetch(title))
+        except Exception as e:  # reported by the caller, worker threads must not print into the prompt
+            return title, False, {}, str(e)
+        return title, success, movie_data, "" if success else "Movie not found"
+
+    updates = {}
+    changed_titles = []
+    failed_titles = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for title, success, movie_data, error in executor.map(fetch_one, titles):
+            if not success:
+                failed_titles[title] = error
+                continue
+            updates[title] = {"fetched": time.time()}
+            if movie_data["rating"] != movies[title]["rating"] or movie_data["poster"] != movies[title]["poster"]:
+                updates[title]["rating"] = movie_data["rating"]
+                updates[title]["poster"] = movie_data["poster"]
+                changed_titles.append(title)
+    return updates, changed_titles, failed_titles
+
+
+def refresh_movies(
+        storage: IStorage,
+        max_age: float,
+        fetch: Callable[[str], dict] = fetch_fresh_movie_data,
+        max_workers: int = 4,
+        requests_per_second: float = 5.0,
+) -> tuple[list[str], dict[str, str]]:
+    """
+    Refetch the data of all movies older than the given age and save the results in one batch
+
+    :param storage: Storage to refresh
+    :param max_age: Maximum age in seconds
+    :param fetch: function returning the raw API data for a title
+    :param max_workers: Maximum number of concurrent requests
+    :param requests_per_second: Maximum number of requests per second
+
+    :return: tuple with a list of the movie names whose rating or poster changed, and a dict with the error
+        message per movie name that could not be fetched
+    """
+    movies = storage.list_movies()
+    stale_titles = find_stale_movies(movies, max_age)
+    if not stale_titles:
+        return [], {}
+    updates, changed_titles, failed_titles = fetch_updates(movies, stale_titles, fetch, max_workers, requests_per_second)
+    if updates and not storage.update_movies(updates):
+        return [], failed_titles
+    return changed_titles, failed_titles
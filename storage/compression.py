@@ -0,0 +1,56 @@
+import bz2
+import gzip
+import lzma
+from typing import IO
+
+
+COMPRESSION_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+    ".lzma": lzma.open,
+}
+
+
+def get_compression_suffix(file_path: str) -> str:
+    """
+    Get the compression suffix of a file path
+
+    :param file_path: Path to the file
+
+    :return: the compression suffix (e.g. ".gz"), empty string if the file is not compressed
+    """
+    for suffix in COMPRESSION_OPENERS:
+        if file_path.endswith(suffix):
+            return suffix
+    return ""
+
+
+def strip_compression_suffix(file_path: str) -> str:
+    """
+    Remove the compression suffix from a file path
+
+    :param file_path: Path to the file
+
+    :return: the file path without the compression suffix, e.g. "movies.json" for "movies.json.gz"
+    """
+    suffix = get_compression_suffix(file_path)
+    if not suffix:
+        return file_path
+    return file_path[:-len(suffix)]
+
+
+def open_storage_file(file_path: str, mode: str, newline: str | None = None) -> IO[str]:
+    """
+    Open a storage file in text mode, compressed files are (de)compressed while streaming
+
+    :param file_path: Path to the file, the compression is selected by its suffix
+    :param mode: "r" or "w"
+    :param newline: passed on to open
+
+    :return: text file object
+    """
+    suffix = get_compression_suffix(file_path)
+    if not suffix:
+        return open(file_path, mode, newline=newline)
+    return COMPRESSION_OPENERS[suffix](file_path, mode + "t", newline=newline)
@@ -0,0 +1,30 @@
+from storage.istorage import IStorage
+from storage.storage_json import StorageJson
+from storage.storage_csv import StorageCSV
+from storage.storage_ndjson import StorageNdjson
+from storage.compression import strip_compression_suffix
+
+
+STORAGE_CLASSES = {
+    ".json": StorageJson,
+    ".csv": StorageCSV,
+    ".ndjson": StorageNdjson,
+}
+
+
+def create_storage(file_path: str, workers: int = 1) -> IStorage | None:
+    """
+    Create the storage matching the extension of a file, e.g. movies.json or movies.csv.gz
+
+    :param file_path: Path to the storage file
+    :param workers: Number of processes parsing large NDJSON files, the other formats ignore it
+
+    :return: the storage, None if the extension is not supported
+    """
+    base_path = strip_compression_suffix(file_path)
+    for extension, storage_class in STORAGE_CLASSES.items():
+        if base_path.endswith(extension):
+            if storage_class is StorageNdjson:
+                return storage_class(file_path, workers=workers)
+            return storage_class(file_path)
+    return None
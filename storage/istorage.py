@@ -1,8 +1,42 @@
+import threading
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 
 class IStorage(ABC):
     """ Interface for the storage module """
+    def __init__(self):
+        # held while the movies data is read, modified and saved, so threads of the app do not lose writes
+        self.lock = threading.RLock()
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """ Counter that increases with every change of the movies data """
+        return self._version
+
+    def mark_changed(self) -> None:
+        """ Increase the version, e.g. after the file was changed by another process """
+        with self.lock:  # called by the watcher and by saves of other threads, increments must not get lost
+            self._version += 1
+
+    def close(self) -> None:
+        """ Release what the storage keeps between calls, e.g. caches or worker processes, it stays usable """
+        pass
+
+    def _commit_movies_data(self, movies_data: dict[str, dict]) -> bool:
+        """
+        Save the movies data and increase the version if it was saved
+
+        :param movies_data: dict with movie names as keys and movie details as values
+
+        :return: True if the data was saved, False if an error occurred
+        """
+        if not self._save_movies_data(movies_data):
+            return False
+        self.mark_changed()
+        return True
+
     @abstractmethod
     def _save_movies_data(self, movies_data: dict[str, dict]) -> bool:
         """
@@ -21,7 +55,15 @@ class IStorage(ABC):
         """
         pass
 
-    def add_movie(self, title: str, year: int, rating: float, poster: str) -> bool:
+    def iter_movies(self) -> Iterator[tuple[str, dict]]:
+        """
+        Iterate over all movies, storages that can read their file row by row override this
+
+        :return: iterator of tuples with movie name and movie details
+        """
+        yield from self.list_movies().items()
+
+    def add_movie(self, title: str, year: int, rating: float, poster: str, fetched: float | None = None) -> bool:
         """
         Add a movie to the database, if it does not already exist
 
@@ -29,18 +71,22 @@ class IStorage(ABC):
         :param year: Release date of the movie
         :param rating: Rating from 0.0 to 10.0
         :param poster: URL of the movie poster
+        :param fetched: Timestamp of when the movie data was fetched from the API, None if unknown
 
         :return: True if the movie was added, False if the movie already exists
         """
-        movies_data = self.list_movies()
-        if title in movies_data:
-            return False
-        movies_data[title] = {
-            "year": year,
-            "rating": rating,
-            "poster": poster
-        }
-        return self._save_movies_data(movies_data)
+        with self.lock:
+            movies_data = self.list_movies()
+            if title in movies_data:
+                return False
+            movies_data[title] = {
+                "year": year,
+                "rating": rating,
+                "poster": poster
+            }
+            if fetched is not None:
+                movies_data[title]["fetched"] = fetched
+            return self._commit_movies_data(movies_data)
 
     def delete_movie(self, title: str) -> bool:
         """
@@ -50,25 +96,49 @@ class IStorage(ABC):
 
         :return: True if the movie was deleted, False if the movie does not exist
         """
-        movies_data = self.list_movies()
-        if title not in movies_data:
-            return False
+        with self.lock:
+            movies_data = self.list_movies()
+            if title not in movies_data:
+                return False
 
-        del movies_data[title]
-        return self._save_movies_data(movies_data)
+            del movies_data[title]
+            return self._commit_movies_data(movies_data)
 
-    def update_movie(self, title: str, rating: float) -> bool:
+    def update_movie(self, title: str, rating: float, poster: str | None = None, fetched: float | None = None) -> bool:
         """
         Update the rating of a movie, if it exists
 
         :param title: Name of the movie
         :param rating: New rating of the movie
+        :param poster: New URL of the movie poster, None to keep the current one
+        :param fetched: Timestamp of when the movie data was fetched from the API, None to keep the current one
 
         :return: True if the movie was updated, False if the movie does not exist
         """
-        movies_data = self.list_movies()
-        if title not in movies_data:
-            return False
+        with self.lock:
+            movies_data = self.list_movies()
+            if title not in movies_data:
+                return False
+
+            movies_data[title]["rating"] = rating
+            if poster is not None:
+                movies_data[title]["poster"] = poster
+            if fetched is not None:
+                movies_data[title]["fetched"] = fetched
+            return self._commit_movies_data(movies_data)
+
+    def update_movies(self, updates: dict[str, dict]) -> bool:
+        """
+        Update several movies with a single save
 
-        movies_data[title]["rating"] = rating
-        return self._save_movies_data(movies_data)
+        :param updates: dict with movie names as keys and the changed movie details as values,
+            movies that do not exist are ignored
+
+        :return: True if the data was saved, False if an error occurred
+        """
+        with self.lock:
+            movies_data = self.list_movies()
+            for title, changed_data in updates.items():
+                if title in movies_data:
+                    movies_data[title].update(changed_data)
+            return self._commit_movies_data(movies_data)
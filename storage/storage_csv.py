@@ -1,7 +1,9 @@
 import csv
 import os
+from typing import Iterator
 
 from storage.istorage import IStorage
+from storage.compression import open_storage_file
 
 
 class StorageCSV(IStorage):
@@ -10,8 +12,9 @@ class StorageCSV(IStorage):
         """
         Constructor for the StorageCSV class
 
-        :param file_path: Path to the CSV file
+        :param file_path: Path to the CSV file, a .gz/.bz2/.xz suffix stores it compressed
         """
+        super().__init__()
         self.file_path = file_path
 
     def _save_movies_data(self, movies_data: dict[str, dict]) -> bool:
@@ -21,11 +24,11 @@ class StorageCSV(IStorage):
         :param movies_data:
         """
         try:
-            with open(self.file_path, "w", newline="") as fileobj:
+            with open_storage_file(self.file_path, "w", newline="") as fileobj:
                 writer = csv.writer(fileobj)
-                writer.writerow(["Title", "Year", "Rating", "Poster"])
+                writer.writerow(["Title", "Year", "Rating", "Poster", "Fetched"])
                 for title, details in movies_data.items():
-                    writer.writerow([title, details["year"], details["rating"], details["poster"]])
+                    writer.writerow([title, details["year"], details["rating"], details["poster"], details.get("fetched", "")])
         except PermissionError:
             print("Could not save the data")
             print("Check if you have the required permissions in:")
@@ -36,6 +39,25 @@ class StorageCSV(IStorage):
             return False
         return True
 
+    @staticmethod
+    def _parse_row(row: list[str]) -> tuple[str, dict]:
+        """
+        Parse a row of the CSV file
+
+        :param row: list of the column values
+
+        :return: tuple with movie name and movie details
+        """
+        title, year, rating, poster = row[:4]
+        details = {
+            "year": int(year),
+            "rating": float(rating),
+            "poster": poster
+        }
+        if len(row) > 4 and row[4]:  # files written before the Fetched column was added lack it
+            details["fetched"] = float(row[4])
+        return title, details
+
     def list_movies(self) -> dict[str, dict]:
         """
         List all movies
@@ -45,17 +67,13 @@ class StorageCSV(IStorage):
         try:
             if os.path.getsize(self.file_path) == 0:  # Check if the file is empty
                 return {}
-            with open(self.file_path, "r", newline="") as fileobj:
+            with open_storage_file(self.file_path, "r", newline="") as fileobj:
                 reader = csv.reader(fileobj)
                 movies_data = {}
                 _ = next(reader)
                 for row in reader:
-                    title, year, rating, poster = row
-                    movies_data[title] = {
-                        "year": int(year),
-                        "rating": float(rating),
-                        "poster": poster
-                    }
+                    title, details = self._parse_row(row)
+                    movies_data[title] = details
         except FileNotFoundError:
             movies_data = {}
         except Exception as e:
@@ -64,6 +82,26 @@ class StorageCSV(IStorage):
             movies_data = {}
         return movies_data
 
+    def iter_movies(self) -> Iterator[tuple[str, dict]]:
+        """
+        Iterate over all movies, reading the file row by row
+
+        :return: iterator of tuples with movie name and movie details
+        """
+        try:
+            if os.path.getsize(self.file_path) == 0:  # Check if the file is empty
+                return
+            with open_storage_file(self.file_path, "r", newline="") as fileobj:
+                reader = csv.reader(fileobj)
+                _ = next(reader)
+                for row in reader:
+                    yield self._parse_row(row)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            print("Stopping the iteration")
+
 
 def main():
     storage = StorageCSV("movies.csv")
@@ -2,6 +2,7 @@ import json
 import os
 
 from storage.istorage import IStorage
+from storage.compression import open_storage_file
 
 
 class StorageJson(IStorage):
@@ -10,8 +11,9 @@ class StorageJson(IStorage):
         """
         Constructor for the StorageJson class
 
-        :param file_path: Path to the JSON file
+        :param file_path: Path to the JSON file, a .gz/.bz2/.xz suffix stores it compressed
         """
+        super().__init__()
         self.file_path = file_path
 
     def _save_movies_data(self, movies_data: dict[str, dict]) -> bool:
@@ -23,7 +25,7 @@ class StorageJson(IStorage):
         :return: True if the data was saved, False if an error occurred
         """
         try:
-            with open(self.file_path, "w") as fileobj:
+            with open_storage_file(self.file_path, "w") as fileobj:
                 json.dump(movies_data, fileobj)
         except PermissionError:
             print("Could not save the data")
@@ -44,7 +46,7 @@ class StorageJson(IStorage):
         try:
             if os.path.getsize(self.file_path) == 0:  # Check if the file is empty
                 return {}
-            with open(self.file_path, "r") as fileobj:
+            with open_storage_file(self.file_path, "r") as fileobj:
                 movies_data = json.load(fileobj)
         except FileNotFoundError:
             movies_data = {}
@@ -0,0 +1,355 @@
+import json
+import os
+from typing import Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from storage.istorage import IStorage
+from storage.compression import open_storage_file, get_compression_suffix
+
+
+_COLUMN_FIELDS = {"year", "rating", "poster"}  # fields every movie has, "fetched" is optional
+_TITLE_PREFIX = '{"title": '
+_decoder = json.JSONDecoder()
+
+
+def _parse_lines(lines) -> dict[str, dict]:
+    """
+    Parse lines of movies, a later line for the same title replaces an earlier one
+
+    :param lines: iterable of lines, bytes or str
+
+    :return: dict with movie names as keys and movie details as values
+    """
+    movies_data = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        movie_data = json.loads(line)
+        title = movie_data.pop("title")
+        movies_data[title] = movie_data
+    return movies_data
+
+
+def _to_columns(movies_data: dict[str, dict]) -> tuple[list, ...] | dict[str, dict]:
+    """
+    Convert movies to one list per field
+
+    Unpickling a few lists of plain values is several times cheaper than unpickling a dict per movie,
+    so a worker returning columns leaves the parent process little more to do than building the dicts.
+
+    :param movies_data: dict with movie names as keys and movie details as values
+
+    :return: tuple of the lists of titles, years, ratings, posters and fetched timestamps (None if unknown),
+        the dict itself if a movie has other fields
+    """
+    for movie_data in movies_data.values():
+        if movie_data.keys() - {"fetched"} != _COLUMN_FIELDS:
+            return movies_data
+    return (
+        list(movies_data),
+        [movie_data["year"] for movie_data in movies_data.values()],
+        [movie_data["rating"] for movie_data in movies_data.values()],
+        [movie_data["poster"] for movie_data in movies_data.values()],
+        [movie_data.get("fetched") for movie_data in movies_data.values()],
+    )
+
+
+def _from_columns(columns: tuple[list, ...] | dict[str, dict]) -> dict[str, dict]:
+    """
+    Build the movies from the lists returned by _to_columns
+
+    :param columns: tuple of lists or dict, as returned by _to_columns
+
+    :return: dict with movie names as keys and movie details as values
+    """
+    if isinstance(columns, dict):
+        return columns
+    titles, years, ratings, posters, fetched_timestamps = columns
+    movies_data = {
+        title: {"year": year, "rating": rating, "poster": poster}
+        for title, year, rating, poster in zip(titles, years, ratings, posters)
+    }
+    for title, fetched in zip(titles, fetched_timestamps):
+        if fetched is not None:
+            movies_data[title]["fetched"] = fetched
+    return movies_data
+
+
+def _parse_chunk(file_path: str, start: int, end: int) -> tuple[list, ...] | dict[str, dict]:
+    """
+    Parse the lines between two byte offsets of an uncompressed file, runs in a worker process
+
+    :param file_path: Path to the NDJSON file
+    :param start: Offset of the first byte, has to be at the start of a line
+    :param end: Offset after the last byte, has to be at the start of a line or the end of the file
+
+    :return: the movies converted with _to_columns
+    """
+    with open(file_path, "rb") as fileobj:
+        fileobj.seek(start)
+        chunk = fileobj.read(end - start)
+    return _to_columns(_parse_lines(chunk.splitlines()))
+
+
+def _find_chunk_offsets(file_path: str, file_size: int, chunk_count: int) -> list[int]:
+    """
+    Split a file into chunks at newline boundaries
+
+    :param file_path: Path to the NDJSON file
+    :param file_size: Size of the file in bytes
+    :param chunk_count: Wanted number of chunks
+
+    :return: sorted list of offsets, starting with 0 and ending with the file size
+    """
+    offsets = [0]
+    with open(file_path, "rb") as fileobj:
+        for i in range(1, chunk_count):
+            fileobj.seek(max(file_size * i // chunk_count, offsets[-1]))
+            fileobj.readline()  # move to the start of the next line
+            offset = fileobj.tell()
+            if offset >= file_size:
+                break
+            if offset > offsets[-1]:
+                offsets.append(offset)
+    offsets.append(file_size)
+    return offsets
+
+
+class StorageNdjson(IStorage):
+    """ Class for storing movies in a line delimited JSON file, one movie per line """
+    def __init__(
+            self,
+            file_path: str,
+            workers: int = 1,
+            parallel_min_size: int = 4 * 1024 * 1024,
+            executor: Executor | None = None,
+    ):
+        """
+        Constructor for the StorageNdjson class
+
+        Parallel parsing is off by default, it only pays off with several free cores, see benchmark_storage.py.
+        The workers send their chunks back as columns, so the parent only builds the dicts.
+
+        :param file_path: Path to the NDJSON file, a .gz/.bz2/.xz suffix stores it compressed
+        :param workers: Number of chunks large files are split into, 1 parses them in this process
+        :param parallel_min_size: Files smaller than this many bytes are parsed without the process pool
+        :param executor: Process pool to parse the chunks in, by default one is started on the first parallel load
+            and reused until close() is called, a later parallel load starts a new one
+        """
+        super().__init__()
+        self.file_path = file_path
+        self.workers = workers
+        self.parallel_min_size = parallel_min_size
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._titles = None
+        self._titles_file_state = None
+
+    def close(self) -> None:
+        """ Shut down the process pool, if this storage started it, and forget the titles in the file """
+        with self.lock:
+            if self._owns_executor and self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+            self._titles = None
+            self._titles_file_state = None
+
+    def _get_file_state(self) -> tuple | None:
+        """
+        Get the stat values used to detect a change of the file
+
+        :return: tuple of inode, size and modification time, None if the file does not exist
+        """
+        try:
+            stat_result = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+
+    def _remember_titles(self, titles: set[str]) -> None:
+        """
+        Remember the titles in the file, valid until the file is changed by someone else
+
+        :param titles: set of the movie names in the file
+        """
+        self._titles = titles
+        self._titles_file_state = self._get_file_state()
+
+    @staticmethod
+    def _format_line(title: str, details: dict) -> str:
+        """
+        Format a movie as one line
+
+        :param title: Name of the movie
+        :param details: dict with the movie details
+
+        :return: JSON object with a trailing newline
+        """
+        return json.dumps({"title": title, **details}) + "\n"
+
+    def _save_movies_data(self, movies_data: dict[str, dict]) -> bool:
+        """
+        Save the movies data to the file
+
+        :param movies_data: dict with movie names as keys and movie details as values
+
+        :return: True if the data was saved, False if an error occurred
+        """
+        try:
+            with open_storage_file(self.file_path, "w") as fileobj:
+                for title, details in movies_data.items():
+                    fileobj.write(self._format_line(title, details))
+        except PermissionError:
+            print("Could not save the data")
+            print("Check if you have the required permissions in:")
+            print(f"CWD: {os.getcwd()}")
+            return False
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return False
+        self._remember_titles(set(movies_data))
+        return True
+
+    def _load_movies_data(self, file_size: int) -> dict[str, dict]:
+        """
+        Parse the whole file, large uncompressed files are split into chunks parsed in parallel
+
+        :param file_size: Size of the file in bytes
+
+        :return: dict with movie names as keys and movie details as values
+        """
+        if get_compression_suffix(self.file_path) or self.workers <= 1 or file_size < self.parallel_min_size:
+            with open_storage_file(self.file_path, "r") as fileobj:
+                return _parse_lines(fileobj)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        offsets = _find_chunk_offsets(self.file_path, file_size, self.workers)
+        movies_data = {}
+        chunks = self._executor.map(
+            _parse_chunk,
+            [self.file_path] * (len(offsets) - 1),
+            offsets[:-1],
+            offsets[1:]
+        )
+        for columns in chunks:  # in file order, so later lines still win
+            movies_data.update(_from_columns(columns))
+        return movies_data
+
+    def list_movies(self) -> dict[str, dict]:
+        """
+        List all movies
+
+        :return: dict with movie names as keys and movie details as values
+        """
+        file_state = self._get_file_state()
+        try:
+            file_size = os.path.getsize(self.file_path)
+            if file_size == 0:  # Check if the file is empty
+                movies_data = {}
+            else:
+                movies_data = self._load_movies_data(file_size)
+        except FileNotFoundError:
+            movies_data = {}
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            print("Returning empty data")
+            movies_data = {}
+        self._titles = set(movies_data)
+        self._titles_file_state = file_state
+        return movies_data
+
+    def _last_line_numbers(self) -> tuple[dict[str, int], Exception | None]:
+        """
+        Find the last line of every title, only the titles are decoded
+
+        :return: tuple with a dict of titles and their last line number, and the error that stopped the reading
+        """
+        last_line_numbers = {}
+        try:
+            with open_storage_file(self.file_path, "r") as fileobj:
+                for line_number, line in enumerate(fileobj):
+                    if not line.strip():
+                        continue
+                    if line.startswith(_TITLE_PREFIX):  # lines written by this class start with the title
+                        title = _decoder.raw_decode(line, len(_TITLE_PREFIX))[0]
+                    else:
+                        title = json.loads(line)["title"]
+                    last_line_numbers[title] = line_number
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            return last_line_numbers, e
+        return last_line_numbers, None
+
+    def iter_movies(self) -> Iterator[tuple[str, dict]]:
+        """
+        Iterate over all movies, reading the file line by line
+
+        The file is read twice, first only the titles are decoded to find the last line of every title.
+        Like list_movies, a title that occurs on several lines is yielded once with the details of its last line.
+
+        :return: iterator of tuples with movie name and movie details
+        """
+        last_line_numbers, error = self._last_line_numbers()
+        if last_line_numbers:
+            try:
+                with open_storage_file(self.file_path, "r") as fileobj:
+                    for line_number, line in enumerate(fileobj):
+                        if not line.strip():
+                            continue
+                        movie_data = json.loads(line)
+                        title = movie_data.pop("title")
+                        if last_line_numbers.get(title) == line_number:
+                            yield title, movie_data
+            except FileNotFoundError:
+                return
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            print(f"An error occurred: {error}")
+            print("Stopping the iteration")
+
+    def add_movie(self, title: str, year: int, rating: float, poster: str, fetched: float | None = None) -> bool:
+        """
+        Add a movie to the database, if it does not already exist
+
+        The movie is appended to the file, the file is only read if it was changed by someone else.
+        A compressed file gets one more compressed stream per added movie, which compresses worse than a single
+        stream; the next delete or update rewrites the file as a single stream.
+
+        :param title: Name of the movie
+        :param year: Release date of the movie
+        :param rating: Rating from 0.0 to 10.0
+        :param poster: URL of the movie poster
+        :param fetched: Timestamp of when the movie data was fetched from the API, None if unknown
+
+        :return: True if the movie was added, False if the movie already exists
+        """
+        with self.lock:
+            if self._titles is None or self._titles_file_state != self._get_file_state():
+                self.list_movies()
+            if title in self._titles:
+                return False
+            details = {
+                "year": year,
+                "rating": rating,
+                "poster": poster
+            }
+            if fetched is not None:
+                details["fetched"] = fetched
+            try:
+                with open_storage_file(self.file_path, "a") as fileobj:
+                    fileobj.write(self._format_line(title, details))
+            except PermissionError:
+                print("Could not save the data")
+                print("Check if you have the required permissions in:")
+                print(f"CWD: {os.getcwd()}")
+                return False
+            except Exception as e:
+                print(f"An error occurred: {e}")
+                return False
+            self._titles.add(title)
+            self._titles_file_state = self._get_file_state()
+            self.mark_changed()
+            return True
@@ -0,0 +1,115 @@
+import os
+import threading
+from typing import Callable
+
+from storage.istorage import IStorage
+
+
+EVENT_ADDED = "added"
+EVENT_REMOVED = "removed"
+EVENT_UPDATED = "updated"
+
+
+def diff_movies(old_movies: dict[str, dict], new_movies: dict[str, dict]) -> list[dict]:
+    """
+    Compare two catalog states
+
+    :param old_movies: dict with movie names as keys and movie details as values
+    :param new_movies: dict with movie names as keys and movie details as values
+
+    :return: list of events, each a dict with "type", "title" and "data" keys
+    """
+    events = []
+    for title, movie_data in new_movies.items():
+        if title not in old_movies:
+            events.append({"type": EVENT_ADDED, "title": title, "data": movie_data})
+        elif old_movies[title] != movie_data:
+            events.append({"type": EVENT_UPDATED, "title": title, "data": movie_data})
+    for title, movie_data in old_movies.items():
+        if title not in new_movies:
+            events.append({"type": EVENT_REMOVED, "title": title, "data": movie_data})
+    return events
+
+
+class StorageWatcher:
+    """ Class for detecting external changes to the file of a file based storage """
+    def __init__(self, storage: IStorage):
+        """
+        Constructor for the StorageWatcher class
+
+        :param storage: File based storage, it needs a file_path attribute
+        """
+        self.storage = storage
+        self.listeners: list[Callable[[list[dict]], None]] = []
+        self._lock = threading.Lock()  # poll may be called from several threads
+        self._file_state = self._get_file_state()
+        self._movies = storage.list_movies()
+
+    @property
+    def movies(self) -> dict[str, dict]:
+        """ The last known state of the catalog """
+        return self._movies
+
+    def add_listener(self, listener: Callable[[list[dict]], None]) -> None:
+        """
+        Register a function that gets called with the list of events after every detected change
+
+        :param listener: function taking a list of events
+        """
+        self.listeners.append(listener)
+
+    def _get_file_state(self) -> tuple | None:
+        """
+        Get the stat values used to detect a change of the file
+
+        :return: tuple of inode, size and modification time, None if the file does not exist
+        """
+        try:
+            stat_result = os.stat(self.storage.file_path)
+        except FileNotFoundError:
+            return None
+        return stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+
+    def poll(self) -> list[dict]:
+        """
+        Check the file once and notify the listeners if the catalog changed
+
+        The file is only read again if its inode, size or modification time changed.
+        A changed catalog increases the version of the storage.
+
+        :return: list of events, empty if nothing changed
+        """
+        # the storage lock first, like record_changes, and so a file another thread of the app is writing is not read
+        with self.storage.lock, self._lock:
+            file_state = self._get_file_state()
+            if file_state == self._file_state:
+                return []
+            self._file_state = file_state
+            new_movies = self.storage.list_movies()
+            events = diff_movies(self._movies, new_movies)
+            self._movies = new_movies
+            if events:
+                self.storage.mark_changed()
+        if events:
+            for listener in self.listeners:
+                listener(events)
+        return events
+
+    def record_changes(self, events: list[dict]) -> None:
+        """
+        Apply changes this process saved through the storage, without reading the file again
+
+        The current stat of the file becomes the known state. To not lose changes by other processes,
+        hold storage.lock, call poll() before the save and this method right after it.
+
+        :param events: list of events, each a dict with "type", "title" and "data" keys
+        """
+        with self.storage.lock, self._lock:
+            for event in events:
+                if event["type"] == EVENT_REMOVED:
+                    self._movies.pop(event["title"], None)
+                else:
+                    self._movies[event["title"]] = event["data"]
+            self._file_state = self._get_file_state()
+        for listener in self.listeners:
+            listener(events)
@@ -0,0 +1,86 @@
+import gc
+import os
+import tempfile
+import weakref
+
+import pytest
+
+from catalog_router import StorageRouter
+from storage.storage_csv import StorageCSV
+from storage.storage_ndjson import StorageNdjson
+
+
+class TestStorageRouter:
+    @pytest.fixture
+    def router(self):
+        with tempfile.TemporaryDirectory() as catalog_dir:
+            router = StorageRouter(catalog_dir)
+            router.get_storage("team_c", create=True)  # a new catalog without movies has no file yet
+            StorageCSV(os.path.join(catalog_dir, "team_d.csv.gz")).add_movie(
+                "Tenet", 2020, 7.3, "https://www.imdb.com/title/tt6723592/"
+            )
+            router.get_storage("team_a", create=True).add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+            router.get_storage("team_a", create=True).add_movie("Alien", 1979, 8.5, "https://www.imdb.com/title/tt0078748/")
+            router.get_storage("team_b", create=True).add_movie("The Matrix Reloaded", 2003, 7.2, "https://www.imdb.com/title/tt0234215/")
+            router.get_storage("team_b", create=True).add_movie("Heat", 1995, 8.3, "https://www.imdb.com/title/tt0113277/")
+            yield router
+
+    def test_catalog_names(self, router):
+        assert router.catalog_names() == ["team_a", "team_b", "team_d"]
+        assert router.get_storage("team_d").file_path.endswith("team_d.csv.gz")
+
+    def test_get_storage_returns_same_instance(self, router):
+        assert router.get_storage("team_a") is router.get_storage("team_a")
+
+    def test_load_catalog_sees_changes(self, router):
+        assert set(router.load_catalog("team_a")) == {"The Matrix", "Alien"}
+        router.get_storage("team_a").delete_movie("Alien")
+        assert set(router.load_catalog("team_a")) == {"The Matrix"}
+
+    def test_memory_budget_evicts_least_recently_used(self, router):
+        router.memory_budget = 1
+        router.load_catalog("team_a")
+        router.load_catalog("team_b")
+        assert router.loaded_catalog_names() == ["team_b"]
+
+    def test_eviction_releases_storage(self, router):
+        StorageNdjson(os.path.join(router.catalog_dir, "team_e.ndjson"))._save_movies_data(
+            {f"Movie {i}": {"year": 2000, "rating": 7.0, "poster": ""} for i in range(100)}
+        )
+        router.memory_budget = 1
+        router.load_catalog("team_e")
+        storage_ref = weakref.ref(router.get_storage("team_e"))
+        assert len(storage_ref()._titles) == 100
+        router.load_catalog("team_a")
+        assert router.loaded_catalog_names() == ["team_a"]
+        gc.collect()
+        assert storage_ref() is None
+
+    def test_eviction_closes_referenced_storage(self, router):
+        StorageNdjson(os.path.join(router.catalog_dir, "team_e.ndjson")).add_movie("Heat", 1995, 8.3, "")
+        storage = router.get_storage("team_e")
+        router.memory_budget = 1
+        router.load_catalog("team_e")
+        router.load_catalog("team_a")
+        assert storage._titles is None
+        assert router.get_storage("team_e") is storage
+        assert storage.add_movie("Heat", 1995, 8.3, "") is False  # still usable after closing
+
+    def test_rejects_invalid_and_missing_catalogs(self, router):
+        for catalog_name in ["../team_a", "team_a/x", "", ".."]:
+            with pytest.raises(ValueError):
+                router.get_storage(catalog_name, create=True)
+        with pytest.raises(ValueError):
+            router.get_storage("team_e")
+
+    def test_global_search(self, router):
+        found_movies = router.global_search("matrix")
+        assert [(catalog_name, movie_name) for catalog_name, movie_name, _ in found_movies] == [
+            ("team_a", "The Matrix"),
+            ("team_b", "The Matrix Reloaded"),
+        ]
+
+    def test_global_top_rated(self, router):
+        top_movies = router.global_top_rated(2)
+        assert [movie_name for _, movie_name, _ in top_movies] == ["The Matrix", "Alien"]
+        assert "team_d" in {catalog_name for catalog_name, _, _ in router.global_top_rated(10)}
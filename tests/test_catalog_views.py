@@ -0,0 +1,53 @@
+from catalog_views import MovieStatistics, MovieGridHtml
+
+
+MOVIES = {
+    "The Matrix": {"year": 1999, "rating": 8.7, "poster": "matrix.jpg"},
+    "Alien": {"year": 1979, "rating": 8.5, "poster": "alien.jpg"},
+    "Heat": {"year": 1995, "rating": 8.3, "poster": "heat.jpg"},
+}
+
+
+class TestMovieStatistics:
+    def test_empty(self):
+        statistics = MovieStatistics()
+        assert statistics.total_movies == 0
+        assert statistics.average_rating == 0
+        assert statistics.median_rating == 0
+        assert statistics.best_movies() == []
+
+    def test_statistics(self):
+        statistics = MovieStatistics(MOVIES)
+        assert statistics.total_movies == 3
+        assert round(statistics.average_rating, 1) == 8.5
+        assert statistics.median_rating == 8.5
+        assert [movie_name for movie_name, _ in statistics.best_movies()] == ["The Matrix"]
+        assert [movie_name for movie_name, _ in statistics.worst_movies()] == ["Heat"]
+
+    def test_apply_events(self):
+        statistics = MovieStatistics(MOVIES)
+        statistics.apply_events([
+            {"type": "removed", "title": "The Matrix", "data": MOVIES["The Matrix"]},
+            {"type": "updated", "title": "Heat", "data": {"year": 1995, "rating": 9.0, "poster": "heat.jpg"}},
+            {"type": "added", "title": "Tenet", "data": {"year": 2020, "rating": 7.3, "poster": "tenet.jpg"}},
+        ])
+        assert statistics.total_movies == 3
+        assert statistics.median_rating == 8.5
+        assert [movie_name for movie_name, _ in statistics.best_movies()] == ["Heat"]
+        assert [movie_name for movie_name, _ in statistics.worst_movies()] == ["Tenet"]
+
+
+class TestMovieGridHtml:
+    def test_apply_events_matches_rebuild(self):
+        movie_grid = MovieGridHtml(MOVIES)
+        movie_grid.apply_events([
+            {"type": "removed", "title": "Alien", "data": MOVIES["Alien"]},
+            {"type": "updated", "title": "Heat", "data": {"year": 1995, "rating": 9.0, "poster": "heat.jpg"}},
+        ])
+        expected_movies = {
+            "The Matrix": MOVIES["The Matrix"],
+            "Heat": {"year": 1995, "rating": 9.0, "poster": "heat.jpg"},
+        }
+        assert movie_grid.render() == MovieGridHtml(expected_movies).render()
+        assert "IMDb: 9.0/10" in movie_grid.render()
+        assert "Alien" not in movie_grid.render()
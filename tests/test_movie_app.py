@@ -0,0 +1,87 @@
+import os
+import tempfile
+import time
+
+import pytest
+
+import movie_app
+from movie_app import MovieApp
+from storage.storage_json import StorageJson
+
+
+class TestMovieAppQueryCache:
+    @pytest.fixture
+    def app(self):
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as temp_file:
+            file_path = temp_file.name
+
+        storage = StorageJson(file_path)
+        storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+        storage.add_movie("Alien", 1979, 8.5, "https://www.imdb.com/title/tt0078748/")
+        yield MovieApp(storage)
+
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def test_repeated_listing_does_not_read_storage(self, app, monkeypatch):
+        app._command_list_movies()
+        calls = []
+        monkeypatch.setattr(app.storage, "list_movies", lambda: calls.append(1) or {})
+        app._command_list_movies()
+        assert calls == []
+        assert app.query_cache.hits == 1
+
+    def test_external_edit_invalidates_listing(self, app, capsys):
+        app._command_list_movies()
+        StorageJson(app.storage.file_path).add_movie("Heat", 1995, 8.3, "https://www.imdb.com/title/tt0113277/")
+        capsys.readouterr()
+        app._command_list_movies()
+        assert "Heat" in capsys.readouterr().out
+
+    def test_own_change_invalidates_statistics(self, app, capsys):
+        app._command_print_statistics()
+        app._command_remove_movie("The Matrix")
+        capsys.readouterr()
+        app._command_print_statistics()
+        output = capsys.readouterr().out
+        assert "Total movies: 1" in output
+        assert "The Matrix" not in output
+
+    def test_remove_updates_sampler_without_reading_storage(self, app, monkeypatch, capsys):
+        app._command_remove_movie("The Matrix")
+        monkeypatch.setattr(app.storage, "list_movies", lambda: pytest.fail("file read again"))
+        for _ in range(20):
+            app._command_print_random_movie("uniform")
+        output = capsys.readouterr().out
+        assert "The Matrix" not in output
+        assert "Alien" in output
+
+    def test_exit_waits_for_background_refresh(self, app, monkeypatch):
+        saved = []
+
+        def slow_refresh(storage, max_age):
+            time.sleep(0.2)
+            saved.append(storage)
+            return [], {}
+
+        monkeypatch.setattr(movie_app, "refresh_movies", slow_refresh)
+        app._command_refresh_movies_in_background(0)
+        with pytest.raises(SystemExit):
+            app._command_graceful_exit()
+        assert saved == [app.storage]
+        assert not app._refresh_thread.is_alive()
+
+    def test_add_after_external_change_keeps_it(self, app, monkeypatch, capsys):
+        StorageJson(app.storage.file_path).add_movie("Heat", 1995, 8.3, "https://www.imdb.com/title/tt0113277/")
+        monkeypatch.setattr(movie_app, "get_movie_data_with_fetch_time", lambda movie_name: ({
+            "Response": "True",
+            "Title": "Se7en",
+            "Year": "1995",
+            "imdbRating": "8.6",
+            "Poster": "https://www.imdb.com/title/tt0114369/",
+        }, 1700000000.0))
+        app._command_add_movie("Se7en")
+        assert set(app.watcher.movies) == set(app.storage.list_movies()) == {"The Matrix", "Alien", "Heat", "Se7en"}
+        assert app.watcher.movies["Se7en"]["fetched"] == 1700000000.0
+        app._command_print_statistics()
+        assert "Total movies: 4" in capsys.readouterr().out
@@ -0,0 +1,64 @@
+import random
+from collections import Counter
+
+from movie_sampler import MovieSampler, build_alias_table, reservoir_sample
+
+
+MOVIES = {
+    "The Matrix": {"year": 1999, "rating": 8.7, "poster": ""},
+    "Alien": {"year": 1979, "rating": 8.5, "poster": ""},
+    "Aliens": {"year": 1986, "rating": 8.4, "poster": ""},
+    "Heat": {"year": 1995, "rating": 8.3, "poster": ""},
+}
+
+
+class TestMovieSampler:
+    def test_empty_sampler(self):
+        sampler = MovieSampler()
+        assert sampler.uniform() is None
+        assert sampler.weighted_by_rating() is None
+        assert sampler.by_decade() is None
+
+    def test_add_and_remove(self):
+        sampler = MovieSampler(MOVIES, rng=random.Random(1))
+        sampler.remove("Alien")
+        sampler.remove("The Matrix")
+        sampler.add("Tenet", {"year": 2020, "rating": 7.3, "poster": ""})
+        assert len(sampler) == 3
+        picked_titles = {sampler.uniform()[0] for _ in range(200)}
+        assert picked_titles == {"Aliens", "Heat", "Tenet"}
+        assert {sampler.by_decade()[0] for _ in range(200)} == picked_titles
+
+    def test_apply_events(self):
+        sampler = MovieSampler(MOVIES)
+        sampler.apply_events([
+            {"type": "removed", "title": "Alien", "data": MOVIES["Alien"]},
+            {"type": "updated", "title": "Heat", "data": {"year": 1995, "rating": 9.9, "poster": ""}},
+        ])
+        assert len(sampler) == 3
+        assert sampler.weighted_by_rating()[0] in {"The Matrix", "Aliens", "Heat"}
+
+    def test_by_decade_is_stratified(self):
+        sampler = MovieSampler(MOVIES, rng=random.Random(1))
+        decades = Counter(sampler.by_decade()[1]["year"] // 10 * 10 for _ in range(3000))
+        assert set(decades) == {1970, 1980, 1990}
+        assert all(800 < count < 1200 for count in decades.values())
+
+    def test_alias_table(self):
+        probabilities, aliases = build_alias_table([1.0, 0.0, 3.0])
+        rng = random.Random(1)
+        counts = Counter()
+        for _ in range(4000):
+            index = rng.randrange(3)
+            if rng.random() >= probabilities[index]:
+                index = aliases[index]
+            counts[index] += 1
+        assert counts[1] == 0
+        assert 2700 < counts[2] < 3300
+
+    def test_reservoir_sample(self):
+        assert reservoir_sample([]) is None
+        rng = random.Random(1)
+        counts = Counter(reservoir_sample(iter(range(4)), rng) for _ in range(4000))
+        assert set(counts) == {0, 1, 2, 3}
+        assert all(800 < count < 1200 for count in counts.values())
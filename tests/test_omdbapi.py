@@ -0,0 +1,53 @@
+import pytest
+
+import omdbapi
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, title: str):
+        self.title = title
+
+    def json(self) -> dict:
+        return {"Response": "True", "Title": self.title, "Year": "1999", "imdbRating": "8.7", "Poster": ""}
+
+
+class TestMovieDataCache:
+    @pytest.fixture(autouse=True)
+    def requests_made(self, monkeypatch):
+        requests_made = []
+
+        def fake_get(url, timeout):
+            title = url.split("&t=")[1]
+            requests_made.append(title)
+            return FakeResponse(title)
+
+        monkeypatch.setattr(omdbapi._session, "get", fake_get)
+        monkeypatch.setattr(omdbapi, "_movie_data_cache", omdbapi.OrderedDict())
+        return requests_made
+
+    def test_cached_lookup_keeps_fetch_time(self, requests_made, monkeypatch):
+        monkeypatch.setattr(omdbapi.time, "time", lambda: 1000.0)
+        _, fetched = omdbapi.get_movie_data_with_fetch_time("The Matrix")
+        monkeypatch.setattr(omdbapi.time, "time", lambda: 2000.0)
+        movie_data, cached_fetched = omdbapi.get_movie_data_with_fetch_time("the matrix")
+        assert requests_made == ["The Matrix"]
+        assert movie_data["Title"] == "The Matrix"
+        assert fetched == cached_fetched == 1000.0
+
+    def test_old_lookup_is_fetched_again(self, requests_made, monkeypatch):
+        monkeypatch.setattr(omdbapi.time, "time", lambda: 1000.0)
+        omdbapi.get_movie_data("The Matrix")
+        monkeypatch.setattr(omdbapi.time, "time", lambda: 1001.0 + omdbapi.MOVIE_DATA_CACHE_MAX_AGE)
+        _, fetched = omdbapi.get_movie_data_with_fetch_time("The Matrix")
+        assert requests_made == ["The Matrix", "The Matrix"]
+        assert fetched == 1001.0 + omdbapi.MOVIE_DATA_CACHE_MAX_AGE
+
+    def test_least_recently_used_lookup_is_dropped(self, requests_made, monkeypatch):
+        monkeypatch.setattr(omdbapi, "MOVIE_DATA_CACHE_SIZE", 2)
+        omdbapi.get_movie_data("The Matrix")
+        omdbapi.get_movie_data("Alien")
+        omdbapi.get_movie_data("The Matrix")
+        omdbapi.get_movie_data("Heat")
+        assert list(omdbapi._movie_data_cache) == ["the matrix", "heat"]
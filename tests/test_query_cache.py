@@ -0,0 +1,42 @@
+from query_cache import QueryCache, estimate_size
+
+
+class TestQueryCache:
+    def test_hit_and_miss(self):
+        cache = QueryCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return [("The Matrix", {"year": 1999, "rating": 8.7})]
+
+        first = cache.get_or_compute(("list_movies", (), 0), compute)
+        second = cache.get_or_compute(("list_movies", (), 0), compute)
+        assert first is second
+        assert len(calls) == 1
+        assert cache.hits == 1
+        assert cache.misses == 1
+        assert cache.hit_rate == 0.5
+
+        cache.get_or_compute(("list_movies", (), 1), compute)
+        assert len(calls) == 2
+
+    def test_evicts_least_recently_used(self):
+        result_size = estimate_size("x" * 100)
+        cache = QueryCache(max_bytes=result_size * 2)
+        cache.get_or_compute("a", lambda: "x" * 100)
+        cache.get_or_compute("b", lambda: "x" * 100)
+        cache.get_or_compute("a", lambda: "x" * 100)
+        cache.get_or_compute("c", lambda: "x" * 100)
+
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert cache.current_bytes <= cache.max_bytes
+        cache.get_or_compute("a", lambda: "x" * 100)
+        assert cache.hits == 2
+
+    def test_result_larger_than_cache_is_not_stored(self):
+        cache = QueryCache(max_bytes=10)
+        assert cache.get_or_compute("a", lambda: "x" * 100) == "x" * 100
+        assert len(cache) == 0
+        assert cache.current_bytes == 0
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+
+import pytest
+
+from refresh import find_stale_movies, refresh_movies
+from storage.storage_json import StorageJson
+
+
+def fake_fetch(title: str) -> dict:
+    return {
+        "Response": "True",
+        "Title": title,
+        "Year": "1999",
+        "imdbRating": "9.1",
+        "Poster": "https://example.com/new.jpg",
+    }
+
+
+class TestRefresh:
+    @pytest.fixture
+    def storage(self):
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            file_path = temp_file.name
+
+        storage = StorageJson(file_path)
+        yield storage
+
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def test_find_stale_movies(self):
+        movies = {
+            "Fresh": {"year": 1999, "rating": 8.7, "poster": "", "fetched": 1000.0},
+            "Stale": {"year": 1999, "rating": 8.7, "poster": "", "fetched": 100.0},
+            "Unknown": {"year": 1999, "rating": 8.7, "poster": ""},
+        }
+        assert find_stale_movies(movies, 500, now=1200.0) == ["Stale", "Unknown"]
+
+    def test_refresh_movies(self, storage):
+        storage.add_movie("The Matrix", 1999, 8.7, "https://example.com/old.jpg")
+        storage.add_movie("Alien", 1979, 8.5, "https://example.com/alien.jpg", time.time())
+
+        changed_titles, failed_titles = refresh_movies(storage, 60, fetch=fake_fetch, requests_per_second=1000)
+
+        assert changed_titles == ["The Matrix"]
+        assert failed_titles == {}
+        movies = storage.list_movies()
+        assert movies["The Matrix"]["rating"] == 9.1
+        assert movies["The Matrix"]["poster"] == "https://example.com/new.jpg"
+        assert "fetched" in movies["The Matrix"]
+        assert movies["Alien"]["rating"] == 8.5
+
+    def test_refresh_movies_reports_failures(self, storage, capsys):
+        storage.add_movie("The Matrix", 1999, 8.7, "https://example.com/old.jpg")
+
+        def failing_fetch(title: str) -> dict:
+            raise Exception("timeout")
+
+        changed_titles, failed_titles = refresh_movies(storage, 60, fetch=failing_fetch, requests_per_second=1000)
+
+        assert changed_titles == []
+        assert failed_titles == {"The Matrix": "timeout"}
+        assert capsys.readouterr().out == ""
@@ -1,10 +1,12 @@
 import os
 import tempfile
+import threading
 
 import pytest
 
 from storage.storage_json import StorageJson
 from storage.storage_csv import StorageCSV
+from storage.storage_ndjson import StorageNdjson
 
 
 class TestStorageJson:
@@ -48,6 +50,47 @@ class TestStorageJson:
         assert storage.delete_movie("The Matrix") is True
         assert storage.list_movies() == {}
 
+    def test_update_movies(self, storage):
+        storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+        storage.add_movie("Alien", 1979, 8.5, "https://www.imdb.com/title/tt0078748/")
+        assert storage.update_movies({"The Matrix": {"rating": 9.0, "fetched": 1700000000.0}}) is True
+        movies = storage.list_movies()
+        assert movies["The Matrix"]["rating"] == 9.0
+        assert movies["The Matrix"]["fetched"] == 1700000000.0
+        assert movies["Alien"]["rating"] == 8.5
+
+    def test_version_increases_on_change(self, storage):
+        version = storage.version
+        storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+        assert storage.version == version + 1
+        storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+        assert storage.version == version + 1
+        storage.delete_movie("The Matrix")
+        assert storage.version == version + 2
+
+    def test_concurrent_adds_are_not_lost(self, storage):
+        threads = [
+            threading.Thread(target=storage.add_movie, args=(f"Movie {i}", 2000, 7.0, ""))
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(storage.list_movies()) == 20
+
+    def test_concurrent_mark_changed_is_not_lost(self, storage):
+        def mark_changed_many_times():
+            for _ in range(10000):
+                storage.mark_changed()
+
+        threads = [threading.Thread(target=mark_changed_many_times) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert storage.version == 40000
+
 
 class TestStorageCSV:
     @pytest.fixture
@@ -88,4 +131,151 @@ class TestStorageCSV:
     def test_delete_movie(self, storage):
         storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
         assert storage.delete_movie("The Matrix") is True
-        assert storage.list_movies() == {}
\ No newline at end of file
+        assert storage.list_movies() == {}
+
+    def test_iter_movies(self, storage):
+        storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+        storage.add_movie("Alien", 1979, 8.5, "https://www.imdb.com/title/tt0078748/")
+        assert dict(storage.iter_movies()) == storage.list_movies()
+
+    def test_fetched_round_trip(self, storage):
+        storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/", 1700000000.5)
+        storage.add_movie("Alien", 1979, 8.5, "https://www.imdb.com/title/tt0078748/")
+        movies = storage.list_movies()
+        assert movies["The Matrix"]["fetched"] == 1700000000.5
+        assert "fetched" not in movies["Alien"]
+
+    def test_read_file_without_fetched_column(self, storage):
+        with open(storage.file_path, "w", newline="") as fileobj:
+            fileobj.write("Title,Year,Rating,Poster\r\nThe Matrix,1999,8.7,https://www.imdb.com/title/tt0133093/\r\n")
+        assert storage.list_movies() == {
+            "The Matrix": {
+                "year": 1999,
+                "rating": 8.7,
+                "poster": "https://www.imdb.com/title/tt0133093/"
+            }
+        }
+        assert storage.update_movie("The Matrix", 9.0, fetched=1700000000.0) is True
+        assert storage.list_movies()["The Matrix"]["fetched"] == 1700000000.0
+
+    def test_iter_movies_stops_at_malformed_row(self, storage):
+        with open(storage.file_path, "w", newline="") as fileobj:
+            fileobj.write("Title,Year,Rating,Poster\r\nThe Matrix,1999,8.7,poster\r\nAlien,unknown,8.5,poster\r\n")
+        assert [movie_name for movie_name, _ in storage.iter_movies()] == ["The Matrix"]
+
+
+class TestCompressedStorage:
+    @pytest.fixture(params=[
+        (StorageJson, ".json.gz"),
+        (StorageJson, ".json.xz"),
+        (StorageCSV, ".csv.bz2"),
+        (StorageCSV, ".csv.gz"),
+    ])
+    def storage(self, request):
+        storage_class, suffix = request.param
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+            file_path = temp_file.name
+
+        storage = storage_class(file_path)
+        yield storage
+
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def test_list_movies_empty(self, storage):
+        assert storage.list_movies() == {}
+
+    def test_add_movie(self, storage):
+        assert storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/") is True
+        assert storage.list_movies() == {
+            "The Matrix": {
+                "year": 1999,
+                "rating": 8.7,
+                "poster": "https://www.imdb.com/title/tt0133093/"
+            }
+        }
+        with open(storage.file_path, "rb") as fileobj:
+            assert b"The Matrix" not in fileobj.read()
+
+
+class TestStorageNdjson:
+    @pytest.fixture
+    def storage(self):
+        with tempfile.NamedTemporaryFile(suffix=".ndjson", delete=False) as temp_file:
+            file_path = temp_file.name
+
+        storage = StorageNdjson(file_path)
+        yield storage
+
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def test_list_movies_empty(self, storage):
+        assert storage.list_movies() == {}
+
+    def test_add_movie(self, storage):
+        assert storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/") is True
+        assert storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/") is False
+        assert storage.list_movies() == {
+            "The Matrix": {
+                "year": 1999,
+                "rating": 8.7,
+                "poster": "https://www.imdb.com/title/tt0133093/"
+            }
+        }
+        with open(storage.file_path, "r") as fileobj:
+            assert len(fileobj.readlines()) == 1
+
+    def test_update_movie(self, storage):
+        storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+        assert storage.update_movie("The Matrix", 9.0) is True
+        assert storage.list_movies()["The Matrix"]["rating"] == 9.0
+
+    def test_delete_movie(self, storage):
+        storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+        assert storage.delete_movie("The Matrix") is True
+        assert storage.list_movies() == {}
+
+    def test_parallel_load(self, storage):
+        movies = {
+            f"Movie {i}": {"year": 1900 + i % 100, "rating": i % 100 / 10, "poster": f"https://example.com/{i}.jpg"}
+            for i in range(1000)
+        }
+        storage._save_movies_data(movies)
+        parallel_storage = StorageNdjson(storage.file_path, workers=3, parallel_min_size=0)
+        try:
+            assert parallel_storage.list_movies() == movies
+            assert parallel_storage.list_movies() == movies  # reuses the pool
+        finally:
+            parallel_storage.close()
+
+    def test_parallel_load_keeps_optional_and_unknown_fields(self, storage):
+        movies = {
+            f"Movie {i}": {"year": 1900 + i, "rating": 5.0, "poster": "", "fetched": 1700000000.0 + i}
+            for i in range(100)
+        }
+        movies["Movie 0"].pop("fetched")
+        movies["Movie 99"]["director"] = "Unknown"  # the chunk of this movie is sent back as dicts
+        storage._save_movies_data(movies)
+        parallel_storage = StorageNdjson(storage.file_path, workers=2, parallel_min_size=0)
+        try:
+            assert parallel_storage.list_movies() == movies
+        finally:
+            parallel_storage.close()
+
+    def test_iter_movies(self, storage):
+        storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+        storage.add_movie("Alien", 1979, 8.5, "https://www.imdb.com/title/tt0078748/")
+        assert dict(storage.iter_movies()) == storage.list_movies()
+
+    def test_iter_movies_yields_duplicated_titles_once(self, storage):
+        with open(storage.file_path, "w") as fileobj:
+            fileobj.write('{"title": "Heat", "year": 1995, "rating": 8.3, "poster": ""}\n')
+            fileobj.write('{"title": "Heat", "year": 1995, "rating": 8.4, "poster": ""}\n')
+        assert list(storage.iter_movies()) == [("Heat", {"year": 1995, "rating": 8.4, "poster": ""})]
+        assert dict(storage.iter_movies()) == storage.list_movies()
+
+    def test_iter_movies_stops_at_malformed_line(self, storage):
+        with open(storage.file_path, "w") as fileobj:
+            fileobj.write('{"title": "Heat", "year": 1995, "rating": 8.3, "poster": ""}\n{"title": "Ali\n')
+        assert [movie_name for movie_name, _ in storage.iter_movies()] == ["Heat"]
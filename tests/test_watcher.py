@@ -0,0 +1,65 @@
+import os
+import tempfile
+
+import pytest
+
+from storage.storage_json import StorageJson
+from storage.watcher import StorageWatcher, diff_movies
+
+
+class TestStorageWatcher:
+    @pytest.fixture
+    def storage(self):
+        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
+            file_path = temp_file.name
+
+        storage = StorageJson(file_path)
+        yield storage
+
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    def test_diff_movies(self):
+        old_movies = {
+            "The Matrix": {"year": 1999, "rating": 8.7, "poster": ""},
+            "Alien": {"year": 1979, "rating": 8.5, "poster": ""},
+        }
+        new_movies = {
+            "The Matrix": {"year": 1999, "rating": 9.0, "poster": ""},
+            "Heat": {"year": 1995, "rating": 8.3, "poster": ""},
+        }
+        events = {(event["type"], event["title"]) for event in diff_movies(old_movies, new_movies)}
+        assert events == {("updated", "The Matrix"), ("added", "Heat"), ("removed", "Alien")}
+
+    def test_poll_without_change(self, storage):
+        watcher = StorageWatcher(storage)
+        assert watcher.poll() == []
+
+    def test_poll_detects_external_change(self, storage):
+        watcher = StorageWatcher(storage)
+        received = []
+        watcher.add_listener(received.extend)
+
+        other_process = StorageJson(storage.file_path)
+        other_process.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+        events = watcher.poll()
+
+        assert [(event["type"], event["title"]) for event in events] == [("added", "The Matrix")]
+        assert received == events
+        assert "The Matrix" in watcher.movies
+        assert watcher.poll() == []
+
+    def test_record_changes_skips_reread(self, storage, monkeypatch):
+        storage.add_movie("The Matrix", 1999, 8.7, "https://www.imdb.com/title/tt0133093/")
+        watcher = StorageWatcher(storage)
+        received = []
+        watcher.add_listener(received.extend)
+
+        storage.delete_movie("The Matrix")
+        events = [{"type": "removed", "title": "The Matrix", "data": watcher.movies["The Matrix"]}]
+        watcher.record_changes(events)
+        monkeypatch.setattr(storage, "list_movies", lambda: pytest.fail("file read again"))
+
+        assert received == events
+        assert watcher.movies == {}
+        assert watcher.poll() == []
@@ -1,6 +1,8 @@
 """ helper functions for getting user input with validation """
 from datetime import datetime
 
+from movie_sampler import SAMPLING_MODES
+
 
 def get_valid_release_year() -> int:
     """ Get a valid release year """
@@ -74,6 +76,40 @@ def get_valid_start_end_year(arg: str) -> int:
     return year
 
 
+def get_valid_max_age_days() -> float:
+    """ Get a valid maximum age in days """
+    valid_input = False
+    while not valid_input:
+        user_input = input("Enter maximum age in days (0 refreshes all movies): ")
+        try:
+            max_age_days = float(user_input)
+        except ValueError:
+            print("Maximum age must be a number")
+            continue
+        if max_age_days < 0:
+            print("Maximum age cannot be negative")
+            continue
+        valid_input = True
+    return max_age_days
+
+
+def get_valid_sampling_mode() -> str:
+    """ Get a valid sampling mode for picking a random movie """
+    valid_input = False
+    while not valid_input:
+        user_input = input(
+            "Pick uniformly, weighted by rating, per decade or while streaming the file? "
+            "([U]niform/[W]eighted/[D]ecade/[S]tream)<Enter for uniform>: "
+        ).lower()
+        if user_input == "":
+            return "uniform"
+        for sampling_mode in SAMPLING_MODES:
+            if user_input in {sampling_mode[0], sampling_mode}:
+                return sampling_mode
+        print("Invalid input")
+    return "uniform" # should never reach this point
+
+
 VALIDATORS = {
     "Release Date": get_valid_release_year,
     "Rating": get_valid_rating,
@@ -82,6 +118,8 @@ VALIDATORS = {
     "Ascending/Descending": get_valid_asc_desc,
     "Start Year": lambda: get_valid_start_end_year("start"),
     "End Year": lambda: get_valid_start_end_year("end"),
+    "Max Age Days": get_valid_max_age_days,
+    "Sampling Mode": get_valid_sampling_mode,
 }
 
 